@@ -5,6 +5,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.strategy.dispersion import DispersionStrategy
 from src.backtest.engine import BacktestEngine
 from src.utils.data_loader import DataLoader
+from src.config.symbols import DEFAULT_ETFS
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
@@ -26,18 +27,7 @@ def main():
     )
     
     # Define symbols to trade
-    symbols = [
-        'SPY',  # S&P 500 ETF
-        'QQQ',  # NASDAQ-100 ETF
-        'IWM',  # Russell 2000 ETF
-        'DIA',  # Dow Jones ETF
-        'EFA',  # EAFE ETF
-        'EEM',  # Emerging Markets ETF
-        'TLT',  # 20+ Year Treasury Bond ETF
-        'GLD',  # Gold ETF
-        'VNQ',  # Real Estate ETF
-        'XLE'   # Energy Sector ETF
-    ]
+    symbols = DEFAULT_ETFS
     
     # Fetch and preprocess data
     end_date = datetime.now(pytz.UTC)
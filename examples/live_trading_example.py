@@ -5,9 +5,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.strategy.dispersion import DispersionStrategy
 from src.broker.ibkr_client import IBKRClient
 from src.utils.data_loader import DataLoader
+from src.config.symbols import DEFAULT_ETFS
 import pandas as pd
 from datetime import datetime, timedelta
-import time
 import logging
 
 # Set up logging
@@ -32,23 +32,12 @@ def main():
     client = IBKRClient()
     
     # Define symbols to trade
-    symbols = [
-        'SPY',  # S&P 500 ETF
-        'QQQ',  # NASDAQ-100 ETF
-        'IWM',  # Russell 2000 ETF
-        'DIA',  # Dow Jones ETF
-        'EFA',  # EAFE ETF
-        'EEM',  # Emerging Markets ETF
-        'TLT',  # 20+ Year Treasury Bond ETF
-        'GLD',  # Gold ETF
-        'VNQ',  # Real Estate ETF
-        'XLE'   # Energy Sector ETF
-    ]
+    symbols = DEFAULT_ETFS
     
     try:
         # Connect to IBKR
         logging.info("Connecting to IBKR...")
-        if not client.connect():
+        if not client.connect(symbols=symbols):
             logging.error("Failed to connect to IBKR")
             return
         
@@ -63,7 +52,7 @@ def main():
                 
                 if prices is None or prices.empty:
                     logging.warning("No market data received")
-                    time.sleep(60)
+                    client.wait_until(datetime.now().astimezone() + timedelta(minutes=1))
                     continue
                 
                 # Get current portfolio value
@@ -95,14 +84,15 @@ def main():
                             if client.close_position(symbol):
                                 logging.info(f"Position closed successfully")
                 
-                # Sleep until next rebalance
-                sleep_time = strategy._get_sleep_time()
-                logging.info(f"Sleeping for {sleep_time} seconds until next rebalance")
-                time.sleep(sleep_time)
+                # Wait until next rebalance, IB events keep being processed
+                next_rebalance = strategy.next_rebalance_time()
+                logging.info(f"Waiting until {next_rebalance} for next rebalance")
+                client.wait_until(next_rebalance)
                 
             except Exception as e:
                 logging.error(f"Error in main loop: {e}")
-                time.sleep(60)  # Wait a minute before retrying
+                # Wait a minute before retrying
+                client.wait_until(datetime.now().astimezone() + timedelta(minutes=1))
     
     except KeyboardInterrupt:
         logging.info("Received keyboard interrupt. Shutting down...")
@@ -0,0 +1,83 @@
+"""
+Numba kernels for the backtest hot loop
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def step(
+    prices_row,
+    qty,
+    entry,
+    sign,
+    active,
+    cost_mul,
+    sig_idx,
+    sig_size,
+    sig_sign,
+    last_val,
+    fill_kind,
+    fill_qty,
+    fill_cost
+):
+    """
+    Apply one bar of signals to the position arrays and mark to market.
+
+    Positions not present in the signals are closed and signalled symbols
+    without an open position are opened. ``sign`` is left untouched on close
+    so the caller can still read the side of the closed position.
+
+    Args:
+        prices_row: Current prices, ordered by column id
+        qty, entry, sign, active: Position arrays, updated in place
+        cost_mul: Cost multiplier, 1 + transaction cost + slippage
+        sig_idx, sig_size, sig_sign: Signals as column ids, notional sizes
+            and +1/-1 sides
+        last_val: Portfolio value at the previous bar
+        fill_kind: Output, +1 for an opened and -1 for a closed position
+        fill_qty, fill_cost: Output, quantity and total cost of each fill
+
+    Returns:
+        Tuple of (portfolio value, number of trades)
+    """
+    n = qty.shape[0]
+    wanted = np.zeros(n, dtype=np.bool_)
+    for k in range(sig_idx.shape[0]):
+        wanted[sig_idx[k]] = True
+
+    n_trades = 0
+    for i in range(n):
+        fill_kind[i] = 0
+        # Close positions that are no longer in signals
+        if active[i] and not wanted[i]:
+            fill_kind[i] = -1
+            fill_qty[i] = qty[i]
+            fill_cost[i] = qty[i] * prices_row[i] * cost_mul
+            qty[i] = 0.0
+            entry[i] = 0.0
+            active[i] = False
+            n_trades += 1
+
+    # Open new positions
+    for k in range(sig_idx.shape[0]):
+        i = sig_idx[k]
+        if not active[i]:
+            price = prices_row[i]
+            quantity = sig_size[k] / price
+            qty[i] = quantity
+            entry[i] = price
+            sign[i] = sig_sign[k]
+            active[i] = True
+            fill_kind[i] = 1
+            fill_qty[i] = quantity
+            fill_cost[i] = quantity * price * cost_mul
+            n_trades += 1
+
+    value = last_val
+    for i in range(n):
+        if active[i]:
+            value += (prices_row[i] - entry[i]) * sign[i] * qty[i]
+
+    return value, n_trades
@@ -1,12 +1,79 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import seaborn as sns
 from ..strategy.dispersion import DispersionStrategy
+from ._kernels import step
 import pytz
 import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+class _TradeLog:
+    """Columnar trade log, grown by doubling and materialized on demand."""
+    
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self.bar = np.empty(capacity, dtype=np.int64)
+        self.symbol = np.empty(capacity, dtype=np.intp)
+        self.kind = np.empty(capacity, dtype=np.int8)
+        self.sign = np.empty(capacity, dtype=np.float64)
+        self.quantity = np.empty(capacity, dtype=np.float64)
+        self.price = np.empty(capacity, dtype=np.float64)
+        self.cost = np.empty(capacity, dtype=np.float64)
+    
+    def append(self, bar, symbol, kind, sign, quantity, price, cost) -> None:
+        """Append a batch of fills from a single bar."""
+        n = len(symbol)
+        end = self.size + n
+        if end > len(self.bar):
+            capacity = max(2 * len(self.bar), end)
+            for name in ('bar', 'symbol', 'kind', 'sign', 'quantity', 'price', 'cost'):
+                old = getattr(self, name)
+                new = np.empty(capacity, dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, name, new)
+        
+        self.bar[self.size:end] = bar
+        self.symbol[self.size:end] = symbol
+        self.kind[self.size:end] = kind
+        self.sign[self.size:end] = sign
+        self.quantity[self.size:end] = quantity
+        self.price[self.size:end] = price
+        self.cost[self.size:end] = cost
+        self.size = end
+    
+    def to_records(self, dates, symbols) -> List[Dict]:
+        """Materialize the log as a list of trade dictionaries."""
+        n = self.size
+        long_side = self.sign[:n] > 0
+        sides = np.where(
+            self.kind[:n] > 0,
+            np.where(long_side, 'LONG', 'SHORT'),
+            np.where(long_side, 'SELL', 'BUY')
+        )
+        return [
+            {
+                'date': dates[bar],
+                'symbol': symbols[symbol],
+                'side': side,
+                'quantity': quantity,
+                'price': price,
+                'cost': cost
+            }
+            for bar, symbol, side, quantity, price, cost in zip(
+                self.bar[:n].tolist(),
+                self.symbol[:n].tolist(),
+                sides.tolist(),
+                self.quantity[:n].tolist(),
+                self.price[:n].tolist(),
+                self.cost[:n].tolist()
+            )
+        ]
 
 class BacktestEngine:
     def __init__(
@@ -14,7 +81,9 @@ class BacktestEngine:
         strategy: DispersionStrategy,
         initial_capital: float = 100000.0,
         transaction_cost: float = 0.001,  # 0.1% per trade
-        slippage: float = 0.0005  # 0.05% slippage
+        slippage: float = 0.0005,  # 0.05% slippage
+        min_correlation_window: int = 20,
+        dtype: np.dtype = np.float32
     ):
         """
         Initialize the backtesting engine.
@@ -24,15 +93,24 @@ class BacktestEngine:
             initial_capital: Initial capital for backtest
             transaction_cost: Transaction cost per trade (as a fraction)
             slippage: Slippage per trade (as a fraction)
+            min_correlation_window: Minimum number of bars handed to the
+                strategy when generating signals
+            dtype: Floating point type of the price matrix used for marking
+                to market. float32 is enough for backtests; pass float64 to
+                validate against full precision. Portfolio values are always
+                accumulated in float64.
         """
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.transaction_cost = transaction_cost
         self.slippage = slippage
-        self.positions: Dict[str, Dict] = {}
+        self.min_correlation_window = min_correlation_window
+        self.dtype = np.dtype(dtype)
+        self._cost_mul = 1.0 + transaction_cost + slippage
         self.trades: List[Dict] = []
-        self.portfolio_value: List[float] = [initial_capital]
-        self.dates: List[datetime] = []
+        self.portfolio_value: np.ndarray = np.array([initial_capital])
+        self.dates: pd.DatetimeIndex = pd.DatetimeIndex([])
+        self._drawdown: np.ndarray = np.zeros(1)
         
     def _ensure_timezone_aware(self, dt: datetime) -> datetime:
         """
@@ -57,6 +135,10 @@ class BacktestEngine:
         """
         Run the backtest.
         
+        The strategy only sees a trailing window of
+        max(strategy.lookback_period, min_correlation_window) bars on each
+        step rather than the entire history up to that date.
+        
         Args:
             prices: DataFrame with asset prices (columns are assets, index is time)
             start_date: Start date for backtest
@@ -65,9 +147,9 @@ class BacktestEngine:
         Returns:
             Dictionary with backtest results
         """
-        print(f"Starting backtest with {len(prices)} price points")
-        print(f"Price columns: {prices.columns.tolist()}")
-        print(f"Price index range: {prices.index[0]} to {prices.index[-1]}")
+        logger.info("Starting backtest with %d price points", len(prices))
+        logger.debug("Price columns: %s", prices.columns.tolist())
+        logger.debug("Price index range: %s to %s", prices.index[0], prices.index[-1])
         
         # Ensure prices index is timezone-aware
         if not isinstance(prices.index, pd.DatetimeIndex):
@@ -75,124 +157,137 @@ class BacktestEngine:
         if prices.index.tz is None:
             prices.index = prices.index.tz_localize('UTC')
         
-        # Convert start and end dates to UTC
+        if not prices.index.is_monotonic_increasing:
+            prices = prices.sort_index()
+        
+        # Convert start and end dates to UTC and slice positionally
+        i0, i1 = 0, len(prices)
         if start_date is not None:
             start_date = self._ensure_timezone_aware(start_date)
-            prices = prices[prices.index >= start_date]
+            i0 = prices.index.searchsorted(start_date, side='left')
         if end_date is not None:
             end_date = self._ensure_timezone_aware(end_date)
-            prices = prices[prices.index <= end_date]
+            i1 = prices.index.searchsorted(end_date, side='right')
+        prices = prices.iloc[i0:i1]
+        
+        # Column-major: each symbol is contiguous, a bar row is only S strided values
+        arr = np.asfortranarray(prices.to_numpy(dtype=self.dtype))
+        
+        # Positions are held as parallel arrays indexed by column id
+        self._symbols = prices.columns.to_numpy()
+        self._col_idx = {symbol: i for i, symbol in enumerate(self._symbols)}
+        n_symbols = arr.shape[1]
+        self._qty = np.zeros(n_symbols)
+        self._entry_price = np.zeros(n_symbols, dtype=self.dtype)
+        self._side_sign = np.zeros(n_symbols)
+        self._active = np.zeros(n_symbols, dtype=np.bool_)
+        self._fill_kind = np.zeros(n_symbols, dtype=np.int8)
+        self._fill_qty = np.zeros(n_symbols)
+        self._fill_cost = np.zeros(n_symbols)
+        self._trade_log = _TradeLog()
         
-        for date, row in prices.iterrows():
-            self.dates.append(date)
-            current_prices = prices.loc[:date]
+        # Portfolio values are written by bar index into a preallocated buffer
+        self.dates = prices.index
+        self.portfolio_value = np.empty(len(prices) + 1, dtype=np.float64)
+        self.portfolio_value[0] = self.initial_capital
+        
+        window = max(self.strategy.lookback_period, self.min_correlation_window)
+        log_progress = logger.isEnabledFor(logging.DEBUG)
+        
+        for t in range(len(prices)):
+            current_prices = prices.iloc[max(0, t - window + 1):t + 1]
             
             # Generate signals
             signals = self.strategy.generate_signals(
                 current_prices,
-                self.portfolio_value[-1]
+                self.portfolio_value[t]
             )
             
-            # Update positions
-            self._update_positions(signals, row)
-            
-            # Calculate portfolio value
-            portfolio_value = self._calculate_portfolio_value(row)
-            self.portfolio_value.append(portfolio_value)
+            # Update positions and mark to market
+            sig_idx, sig_size, sig_sign = self._signals_to_arrays(signals)
+            portfolio_value = self._update_positions(sig_idx, sig_size, sig_sign, arr[t], t)
+            self.portfolio_value[t + 1] = portfolio_value
             
-            if len(self.portfolio_value) % 50 == 0:  # Print every 50 iterations
-                print(f"Processed {len(self.portfolio_value)} dates, current portfolio value: {portfolio_value:.2f}")
-        
-        print(f"Backtest complete. Total dates processed: {len(self.dates)}")
-        print(f"Final portfolio value: {self.portfolio_value[-1]:.2f}")
-        return self._generate_results()
-    
-    def _update_positions(self, signals: Dict, prices: pd.Series) -> None:
-        """
-        Update positions based on signals.
-        
-        Args:
-            signals: Dictionary of trading signals
-            prices: Current prices for all assets
-        """
-        # Close positions that are no longer in signals
-        for symbol in list(self.positions.keys()):
-            if symbol not in signals:
-                position = self.positions[symbol]
-                price = prices[symbol]
-                cost = self._calculate_trade_cost(
-                    position['quantity'],
-                    price
+            if log_progress and (t + 1) % 50 == 0:
+                logger.debug(
+                    "Processed %d dates, current portfolio value: %.2f",
+                    t + 1, portfolio_value
                 )
-                
-                self.trades.append({
-                    'date': self.dates[-1],
-                    'symbol': symbol,
-                    'side': 'SELL' if position['side'] == 'LONG' else 'BUY',
-                    'quantity': position['quantity'],
-                    'price': price,
-                    'cost': cost
-                })
-                
-                del self.positions[symbol]
         
-        # Open new positions
-        for symbol, signal in signals.items():
-            if symbol not in self.positions:
-                price = prices[symbol]
-                quantity = signal['size'] / price
-                cost = self._calculate_trade_cost(quantity, price)
-                
-                self.positions[symbol] = {
-                    'quantity': quantity,
-                    'side': signal['side'],
-                    'entry_price': price,
-                    'entry_date': self.dates[-1]
-                }
-                
-                self.trades.append({
-                    'date': self.dates[-1],
-                    'symbol': symbol,
-                    'side': signal['side'],
-                    'quantity': quantity,
-                    'price': price,
-                    'cost': cost
-                })
+        logger.info(
+            "Backtest complete. Total dates processed: %d, final portfolio value: %.2f",
+            len(self.dates), self.portfolio_value[-1]
+        )
+        return self._generate_results()
     
-    def _calculate_trade_cost(self, quantity: float, price: float) -> float:
+    def _signals_to_arrays(
+        self,
+        signals: Dict
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Calculate total cost of a trade including transaction costs and slippage.
+        Convert strategy signals to index form.
         
         Args:
-            quantity: Trade quantity
-            price: Trade price
+            signals: Dictionary of trading signals keyed by symbol
             
         Returns:
-            float: Total cost of the trade
+            Tuple of (column ids, position sizes, +1/-1 sides)
         """
-        base_cost = quantity * price
-        transaction_cost = base_cost * self.transaction_cost
-        slippage_cost = base_cost * self.slippage
-        return base_cost + transaction_cost + slippage_cost
+        sig_idx = np.array([self._col_idx[symbol] for symbol in signals], dtype=np.intp)
+        sig_size = np.array([signal['size'] for signal in signals.values()], dtype=np.float64)
+        sig_sign = np.array(
+            [1.0 if signal['side'] == 'LONG' else -1.0 for signal in signals.values()]
+        )
+        return sig_idx, sig_size, sig_sign
     
-    def _calculate_portfolio_value(self, prices: pd.Series) -> float:
+    def _update_positions(
+        self,
+        sig_idx: np.ndarray,
+        sig_size: np.ndarray,
+        sig_sign: np.ndarray,
+        prices: np.ndarray,
+        t: int
+    ) -> float:
         """
-        Calculate current portfolio value.
+        Update positions based on signals and calculate portfolio value.
         
         Args:
-            prices: Current prices for all assets
+            sig_idx: Column ids of signalled assets
+            sig_size: Position size for each signalled asset
+            sig_sign: +1 for LONG, -1 for SHORT for each signalled asset
+            prices: Current prices for all assets, ordered by column id
+            t: Index of the current bar
             
         Returns:
             float: Current portfolio value
         """
-        value = self.portfolio_value[-1]
+        value, n_trades = step(
+            prices,
+            self._qty,
+            self._entry_price,
+            self._side_sign,
+            self._active,
+            self._cost_mul,
+            sig_idx,
+            sig_size,
+            sig_sign,
+            self.portfolio_value[t],
+            self._fill_kind,
+            self._fill_qty,
+            self._fill_cost
+        )
         
-        for symbol, position in self.positions.items():
-            price = prices[symbol]
-            if position['side'] == 'LONG':
-                value += position['quantity'] * (price - position['entry_price'])
-            else:
-                value += position['quantity'] * (position['entry_price'] - price)
+        if n_trades:
+            idx = np.flatnonzero(self._fill_kind)
+            self._trade_log.append(
+                t,
+                idx,
+                self._fill_kind[idx],
+                self._side_sign[idx],
+                self._fill_qty[idx],
+                prices[idx],
+                self._fill_cost[idx]
+            )
         
         return value
     
@@ -203,23 +298,25 @@ class BacktestEngine:
         Returns:
             Dictionary with backtest results
         """
+        pv = self.portfolio_value
+        
         # Calculate returns
-        returns = pd.Series(self.portfolio_value).pct_change().dropna()
+        returns = np.diff(pv) / pv[:-1]
         
         # Calculate statistics
-        total_return = (self.portfolio_value[-1] / self.initial_capital) - 1
+        total_return = (pv[-1] / self.initial_capital) - 1
         annual_return = (1 + total_return) ** (252 / len(returns)) - 1
-        sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std()
+        sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std(ddof=1)
         
         # Calculate max drawdown
-        portfolio_series = pd.Series(self.portfolio_value)
-        rolling_max = portfolio_series.cummax()
-        drawdowns = (rolling_max - portfolio_series) / rolling_max
-        max_drawdown = float(drawdowns.max())  # Convert to float
+        self._drawdown = 1 - pv / np.maximum.accumulate(pv)
+        max_drawdown = float(self._drawdown.max())
         
         # Generate trade statistics
-        trades_df = pd.DataFrame(self.trades)
-        win_rate = len(trades_df[trades_df['cost'] > 0]) / len(trades_df) if len(trades_df) > 0 else 0
+        n_trades = self._trade_log.size
+        costs = self._trade_log.cost[:n_trades]
+        win_rate = np.count_nonzero(costs > 0) / n_trades if n_trades > 0 else 0
+        self.trades = self._trade_log.to_records(self.dates, self._symbols)
         
         return {
             'total_return': total_return,
@@ -227,8 +324,9 @@ class BacktestEngine:
             'sharpe_ratio': sharpe_ratio,
             'max_drawdown': max_drawdown,
             'win_rate': win_rate,
-            'num_trades': len(self.trades),
+            'num_trades': n_trades,
             'portfolio_value': self.portfolio_value,
+            'drawdown': self._drawdown,
             'dates': self.dates,
             'trades': self.trades
         }
@@ -240,27 +338,30 @@ class BacktestEngine:
         Args:
             save_path: Optional path to save the plot
         """
-        plt.figure(figsize=(12, 8))
+        # Saved plots use a standalone Figure rendered by Agg, so no GUI
+        # backend is initialized and pyplot does not retain the figure
+        if save_path:
+            fig = Figure(figsize=(12, 8))
+        else:
+            fig = plt.figure(figsize=(12, 8))
+        ax1, ax2 = fig.subplots(2, 1)
         
         # Plot portfolio value
-        plt.subplot(2, 1, 1)
-        plt.plot(self.dates, self.portfolio_value[1:])
-        plt.title('Portfolio Value')
-        plt.grid(True)
+        ax1.plot(self.dates, self.portfolio_value[1:])
+        ax1.set_title('Portfolio Value')
+        ax1.grid(True)
         
         # Plot drawdown
-        plt.subplot(2, 1, 2)
-        portfolio_series = pd.Series(self.portfolio_value[1:], index=self.dates)
-        drawdown = (portfolio_series.cummax() - portfolio_series) / portfolio_series.cummax()
-        plt.plot(self.dates, drawdown)
-        plt.title('Drawdown')
-        plt.grid(True)
+        ax2.plot(self.dates, self._drawdown[1:])
+        ax2.set_title('Drawdown')
+        ax2.grid(True)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save_path:
             # Create directory if it doesn't exist
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            plt.savefig(save_path)
+            fig.savefig(save_path, dpi=100)
         else:
-            plt.show() 
\ No newline at end of file
+            plt.show()
+            plt.close(fig)
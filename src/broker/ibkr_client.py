@@ -1,23 +1,41 @@
 import os
-from typing import Dict, List, Optional
+import time
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from ib_insync import *
 from dotenv import load_dotenv
 
 class IBKRClient:
-    def __init__(self):
-        """Initialize IBKR client with environment variables."""
+    def __init__(self, order_timeout: float = 30.0, account_timeout: float = 10.0):
+        """
+        Initialize IBKR client with environment variables.
+        
+        Args:
+            order_timeout: Seconds to wait for an order to complete
+            account_timeout: Seconds to wait for the first NetLiquidation
+                value after connecting
+        """
         load_dotenv()
+        self.order_timeout = order_timeout
+        self.account_timeout = account_timeout
         self.ib = IB()
         self.connected = False
         self.positions: Dict[str, Position] = {}
         self.market_data: Dict[str, pd.DataFrame] = {}
+        self._contracts: Dict[str, Contract] = {}
+        self._net_liq: Optional[float] = None
         
-    def connect(self) -> bool:
+    def connect(self, symbols: Optional[List[str]] = None) -> bool:
         """
         Connect to IBKR TWS/Gateway.
         
+        Args:
+            symbols: Optional symbol universe whose contracts are qualified
+                once up front
+        
         Returns:
             bool: True if connection successful, False otherwise
         """
@@ -28,6 +46,13 @@ class IBKRClient:
                 clientId=int(os.getenv('IBKR_CLIENT_ID', '1'))
             )
             self.connected = True
+            
+            # Keep NetLiquidation current from pushed account summary updates
+            self.ib.accountSummaryEvent += self._on_account_summary
+            self.ib.reqAccountSummary()
+            
+            if symbols:
+                self._qualify(symbols)
             return True
         except Exception as e:
             print(f"Failed to connect to IBKR: {e}")
@@ -36,12 +61,67 @@ class IBKRClient:
     def disconnect(self) -> None:
         """Disconnect from IBKR."""
         if self.connected:
+            self.ib.accountSummaryEvent -= self._on_account_summary
             self.ib.disconnect()
             self.connected = False
     
+    def _on_account_summary(self, value: AccountValue) -> None:
+        """Cache the latest NetLiquidation value pushed by IBKR."""
+        if value.tag == 'NetLiquidation':
+            self._net_liq = float(value.value)
+    
+    def _qualify(self, symbols: List[str]) -> None:
+        """
+        Qualify and cache stock contracts for symbols not seen before.
+        
+        Contracts IBKR could not qualify (conId 0) are not cached, so they
+        are retried on the next call.
+        """
+        missing = [symbol for symbol in symbols if symbol not in self._contracts]
+        if missing:
+            contracts = [Stock(symbol, 'SMART', 'USD') for symbol in missing]
+            self.ib.qualifyContracts(*contracts)
+            self._contracts.update(
+                (symbol, contract)
+                for symbol, contract in zip(missing, contracts)
+                if contract.conId
+            )
+    
+    def _contract(self, symbol: str) -> Contract:
+        """Return the qualified contract for a symbol."""
+        if symbol not in self._contracts:
+            self._qualify([symbol])
+            if symbol not in self._contracts:
+                raise ValueError(f"Could not qualify contract for {symbol}")
+        return self._contracts[symbol]
+    
+    async def _fetch_one(
+        self,
+        symbol: str,
+        duration: str,
+        bar_size: str
+    ) -> Tuple[str, Optional[pd.DatetimeIndex], Optional[np.ndarray]]:
+        """Request historical bar dates and close prices for a single symbol."""
+        bars = await self.ib.reqHistoricalDataAsync(
+            self._contracts[symbol],
+            endDateTime='',
+            durationStr=duration,
+            barSizeSetting=bar_size,
+            whatToShow='TRADES',
+            useRTH=True
+        )
+        
+        if not bars:
+            return symbol, None, None
+        return (
+            symbol,
+            pd.DatetimeIndex([bar.date for bar in bars]),
+            np.array([bar.close for bar in bars], dtype=np.float64)
+        )
+    
     def get_market_data(
         self,
-        symbols: List[str],
+        symbols: Optional[List[str]] = None,
         duration: str = '1 D',
         bar_size: str = '1 min'
     ) -> pd.DataFrame:
@@ -49,7 +129,8 @@ class IBKRClient:
         Get historical market data for specified symbols.
         
         Args:
-            symbols: List of symbols to fetch data for
+            symbols: List of symbols to fetch data for. If None, uses the
+                symbols passed to connect()
             duration: Duration of historical data
             bar_size: Bar size for historical data
             
@@ -59,50 +140,116 @@ class IBKRClient:
         if not self.connected:
             raise ConnectionError("Not connected to IBKR")
         
-        data = {}
-        for symbol in symbols:
-            contract = Stock(symbol, 'SMART', 'USD')
-            bars = self.ib.reqHistoricalData(
-                contract,
-                endDateTime='',
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow='TRADES',
-                useRTH=True
-            )
+        if symbols is None:
+            symbols = list(self._contracts)
+        self._qualify(symbols)
+        symbols = [symbol for symbol in symbols if symbol in self._contracts]
+        
+        # Issue all requests concurrently rather than one round trip per symbol
+        results = self.ib.run(asyncio.gather(
+            *(self._fetch_one(symbol, duration, bar_size) for symbol in symbols)
+        ))
+        
+        fetched = [result for result in results if result[1] is not None]
+        if not fetched:
+            return pd.DataFrame()
+        
+        # Align every symbol on the union of bar dates, gaps stay NaN
+        index = fetched[0][1]
+        for _, dates, _ in fetched[1:]:
+            index = index.union(dates)
+        values = np.full((len(index), len(fetched)), np.nan)
+        for k, (_, dates, closes) in enumerate(fetched):
+            values[index.get_indexer(dates), k] = closes
+        
+        return pd.DataFrame(
+            values,
+            index=index,
+            columns=[symbol for symbol, _, _ in fetched]
+        )
+    
+    def _wait_on_updates(self, done: Callable[[], bool], timeout: float) -> bool:
+        """
+        Process IB updates until a condition holds, without polling.
+        
+        Args:
+            done: Condition re-checked after every update
+            timeout: Seconds to wait at most
             
-            if bars:
-                df = util.df(bars)
-                data[symbol] = df['close']
+        Returns:
+            bool: True if the condition holds, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while not done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.ib.waitOnUpdate(timeout=remaining)
+        return True
+    
+    def _wait_for_fill(self, trade: Trade) -> bool:
+        """
+        Wait for a trade to complete without polling.
         
-        return pd.DataFrame(data)
+        An order still working after order_timeout is cancelled, so it
+        cannot fill later behind the caller's back.
+        
+        Args:
+            trade: Trade returned by placeOrder
+            
+        Returns:
+            bool: True if the order filled, False if it was cancelled,
+                rejected or timed out
+        """
+        if not self._wait_on_updates(trade.isDone, self.order_timeout):
+            print(f"Timed out waiting for order {trade.order.orderId}, cancelling it")
+            self.ib.cancelOrder(trade.order)
+            return False
+        
+        # Done also covers cancelled and rejected orders
+        if trade.orderStatus.status != OrderStatus.Filled:
+            print(f"Order {trade.order.orderId} ended {trade.orderStatus.status} without a fill")
+            return False
+        return True
+    
+    def wait_until(self, when: datetime) -> None:
+        """
+        Block until a point in time while the IB event loop keeps running.
+        
+        Unlike time.sleep, account, order and market data events are still
+        processed while waiting.
+        
+        Args:
+            when: Time to wait until, naive values are taken as local time
+        """
+        util.waitUntil(when)
     
     def get_portfolio_value(self) -> float:
         """
         Get current portfolio value.
         
+        The NetLiquidation value is kept up to date by the account summary
+        subscription started in connect(), so this does not hit the network.
+        Right after connecting it waits up to account_timeout seconds for
+        the first value.
+        
         Returns:
             float: Current portfolio value
+            
+        Raises:
+            TimeoutError: If no NetLiquidation value arrived in time
         """
         if not self.connected:
             raise ConnectionError("Not connected to IBKR")
         
-        account = self.ib.managedAccounts()[0]
-        portfolio = self.ib.portfolio()
-        
-        # Calculate total portfolio value
-        total_value = 0
-        for position in portfolio:
-            total_value += position.position * position.avgCost
+        if self._net_liq is None:
+            for summary in self.ib.accountSummary():
+                self._on_account_summary(summary)
         
-        # Add cash
-        account_summary = self.ib.accountSummary()
-        for summary in account_summary:
-            if summary.tag == 'NetLiquidation':
-                total_value += float(summary.value)
-                break
+        if not self._wait_on_updates(lambda: self._net_liq is not None, self.account_timeout):
+            raise TimeoutError("No NetLiquidation value received from IBKR")
         
-        return total_value
+        return self._net_liq
     
     def place_order(
         self,
@@ -121,19 +268,20 @@ class IBKRClient:
             order_type: Order type (default: 'MKT')
             
         Returns:
-            Optional[int]: Order ID if successful, None otherwise
+            Optional[int]: Order ID if filled, None on error, timeout (the
+                order is then cancelled) or if the order was cancelled or
+                rejected
         """
         if not self.connected:
             raise ConnectionError("Not connected to IBKR")
         
         try:
-            contract = Stock(symbol, 'SMART', 'USD')
+            contract = self._contract(symbol)
             order = MarketOrder(side, quantity)
             trade = self.ib.placeOrder(contract, order)
             
-            # Wait for order to fill
-            while not trade.isDone():
-                self.ib.sleep(0.1)
+            if not self._wait_for_fill(trade):
+                return None
             
             return trade.order.orderId
         except Exception as e:
@@ -148,13 +296,13 @@ class IBKRClient:
             symbol: Symbol to close position for
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if the closing order filled, False otherwise
         """
         if not self.connected:
             raise ConnectionError("Not connected to IBKR")
         
         try:
-            contract = Stock(symbol, 'SMART', 'USD')
+            contract = self._contract(symbol)
             position = self.ib.positions(contract)[0]
             
             if position:
@@ -165,11 +313,7 @@ class IBKRClient:
                 order = MarketOrder(side, quantity)
                 trade = self.ib.placeOrder(contract, order)
                 
-                # Wait for order to fill
-                while not trade.isDone():
-                    self.ib.sleep(0.1)
-                
-                return True
+                return self._wait_for_fill(trade)
         except Exception as e:
             print(f"Error closing position: {e}")
         
@@ -189,7 +333,7 @@ class IBKRClient:
             raise ConnectionError("Not connected to IBKR")
         
         try:
-            contract = Stock(symbol, 'SMART', 'USD')
+            contract = self._contract(symbol)
             ticker = self.ib.reqMktData(contract)
             self.ib.sleep(1)  # Wait for data
             
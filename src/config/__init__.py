@@ -0,0 +1,7 @@
+"""
+Configuration package
+"""
+
+from .symbols import DEFAULT_ETFS
+
+__all__ = ['DEFAULT_ETFS']
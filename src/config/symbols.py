@@ -0,0 +1,15 @@
+from typing import Tuple
+
+# Default trading universe shared by the backtest and live trading scripts
+DEFAULT_ETFS: Tuple[str, ...] = (
+    'SPY',  # S&P 500 ETF
+    'QQQ',  # NASDAQ-100 ETF
+    'IWM',  # Russell 2000 ETF
+    'DIA',  # Dow Jones ETF
+    'EFA',  # EAFE ETF
+    'EEM',  # Emerging Markets ETF
+    'TLT',  # 20+ Year Treasury Bond ETF
+    'GLD',  # Gold ETF
+    'VNQ',  # Real Estate ETF
+    'XLE'   # Energy Sector ETF
+)
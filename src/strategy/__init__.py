@@ -2,6 +2,6 @@
 Strategy implementation package
 """
 
-from .dispersion import DispersionStrategy, Position
+from .dispersion import DispersionStrategy, Position, PositionsStore
 
-__all__ = ['DispersionStrategy', 'Position'] 
\ No newline at end of file
+__all__ = ['DispersionStrategy', 'Position', 'PositionsStore'] 
\ No newline at end of file
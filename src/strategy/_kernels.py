@@ -0,0 +1,44 @@
+"""
+Numba kernels for the strategy
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def row_std(x):
+    """
+    Sample standard deviation of each row, skipping NaNs.
+
+    Matches DataFrame.std(axis=1): ddof=1, and NaN for rows with fewer
+    than two valid values.
+
+    Args:
+        x: 2-D array of shape (T, N)
+
+    Returns:
+        Array of shape (T,)
+    """
+    n_rows, n_cols = x.shape
+    out = np.empty(n_rows)
+    for t in prange(n_rows):
+        total = 0.0
+        count = 0
+        for c in range(n_cols):
+            v = x[t, c]
+            if not np.isnan(v):
+                total += v
+                count += 1
+        if count < 2:
+            out[t] = np.nan
+            continue
+
+        mean = total / count
+        m2 = 0.0
+        for c in range(n_cols):
+            v = x[t, c]
+            if not np.isnan(v):
+                m2 += (v - mean) * (v - mean)
+        out[t] = np.sqrt(m2 / (count - 1))
+    return out
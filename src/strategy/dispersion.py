@@ -1,8 +1,11 @@
+import weakref
 import numpy as np
 import pandas as pd
+from scipy.linalg.blas import dsyrk
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from ._kernels import row_std
 
 @dataclass
 class Position:
@@ -12,6 +15,94 @@ class Position:
     entry_time: datetime
     side: str  # 'LONG' or 'SHORT'
 
+# Rebalances run shortly before the US equity close, on exchange wall-clock time
+_MARKET_TZ = 'US/Eastern'
+_REBALANCE_TIME = pd.Timedelta(hours=15, minutes=55)
+
+class PositionsStore:
+    """
+    Open positions held as parallel arrays, one row per symbol.
+    
+    Rows are packed: removing a position moves the last row into its slot,
+    so every array prefix of length len(store) is live.
+    """
+    
+    def __init__(self, capacity: int = 16):
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.quantity = np.empty(capacity, dtype=np.float64)
+        self.entry_price = np.empty(capacity, dtype=np.float64)
+        self.entry_time = np.empty(capacity, dtype=np.int64)  # ns since epoch
+        self.side = np.empty(capacity, dtype=np.int8)  # +1 LONG, -1 SHORT
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+    
+    def add(
+        self,
+        symbol: str,
+        quantity: float,
+        entry_price: Optional[float],
+        entry_time: datetime,
+        side: str
+    ) -> None:
+        """
+        Append a position, growing the arrays by doubling when full.
+        
+        Args:
+            symbol: Symbol of the position
+            quantity: Position size
+            entry_price: Entry price, NaN is stored when unknown
+            entry_time: Time the position was opened
+            side: 'LONG' or 'SHORT'
+        """
+        row = len(self.symbols)
+        if row == len(self.quantity):
+            for name in ('quantity', 'entry_price', 'entry_time', 'side'):
+                old = getattr(self, name)
+                new = np.empty(2 * len(old), dtype=old.dtype)
+                new[:row] = old
+                setattr(self, name, new)
+        
+        self.symbols.append(symbol)
+        self.index[symbol] = row
+        self.quantity[row] = quantity
+        self.entry_price[row] = np.nan if entry_price is None else entry_price
+        self.entry_time[row] = pd.Timestamp(entry_time).value
+        self.side[row] = 1 if side == 'LONG' else -1
+    
+    def remove(self, symbol: str) -> None:
+        """Remove a position by moving the last row into its slot."""
+        row = self.index.pop(symbol)
+        last = len(self.symbols) - 1
+        if row != last:
+            moved = self.symbols[last]
+            self.symbols[row] = moved
+            self.index[moved] = row
+            for values in (self.quantity, self.entry_price, self.entry_time, self.side):
+                values[row] = values[last]
+        self.symbols.pop()
+    
+    def rows(self, symbols: List[str]) -> np.ndarray:
+        """Return the row of each symbol, all symbols must be held."""
+        return np.array([self.index[symbol] for symbol in symbols], dtype=np.intp)
+    
+    def get(self, symbol: str) -> Optional[Position]:
+        """Materialize a single position, None if the symbol is not held."""
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        return Position(
+            symbol=symbol,
+            quantity=float(self.quantity[row]),
+            entry_price=float(self.entry_price[row]),
+            entry_time=pd.Timestamp(int(self.entry_time[row])).to_pydatetime(),
+            side='LONG' if self.side[row] > 0 else 'SHORT'
+        )
+
 class DispersionStrategy:
     def __init__(
         self,
@@ -33,7 +124,11 @@ class DispersionStrategy:
         self.min_correlation = min_correlation
         self.max_position_size = max_position_size
         self.rebalance_frequency = rebalance_frequency
-        self.positions: Dict[str, Position] = {}
+        self.positions = PositionsStore()
+        self._prep_ref = None
+        self._prep_key = None
+        self._prep_value = None
+        self._corr_state = None
         
     def calculate_dispersion(self, prices: pd.DataFrame) -> pd.Series:
         """
@@ -45,8 +140,102 @@ class DispersionStrategy:
         Returns:
             Series of dispersion values
         """
-        returns = prices.pct_change()
-        return returns.std(axis=1)
+        arr = prices.to_numpy(dtype=np.float64)
+        returns = np.full(arr.shape, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = arr[1:] / arr[:-1] - 1.0
+        return pd.Series(row_std(returns), index=prices.index)
+    
+    def _prep(self, prices: pd.DataFrame) -> Tuple[np.ndarray, pd.Index, np.ndarray]:
+        """
+        Compute returns and their correlation matrix, memoized per frame.
+        
+        The last result is reused while the same frame object, with the same
+        shape and index bounds, is passed again, so find_correlated_pairs,
+        calculate_position_sizes and generate_signals on one frame share the
+        work. Frames mutated in place are not detected.
+        
+        Args:
+            prices: DataFrame with asset prices
+            
+        Returns:
+            Tuple of (returns ndarray with incomplete rows dropped, columns,
+            correlation matrix)
+        """
+        key = (prices.shape, prices.index[0], prices.index[-1]) if len(prices) else None
+        if self._prep_ref is not None and self._prep_ref() is prices and self._prep_key == key:
+            return self._prep_value
+        
+        # Simple returns straight from the price array, no intermediate frames
+        arr = prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = arr[1:] / arr[:-1] - 1.0
+        # Rows with a gap are dropped, as dropna() did, only copying when there are any
+        complete = ~np.isnan(values).any(axis=1)
+        if not complete.all():
+            values = values[complete]
+        cols = prices.columns
+        
+        corr = self._rolling_corr(values, cols)
+        
+        self._prep_ref = weakref.ref(prices)
+        self._prep_key = key
+        self._prep_value = (values, cols, corr)
+        return self._prep_value
+    
+    def _rolling_corr(self, values: np.ndarray, cols: pd.Index) -> np.ndarray:
+        """
+        Correlation matrix of a returns window, updated incrementally.
+        
+        Keeps the column sums and the cross-product matrix of the previous
+        window. When the new window is the previous one slid or grown by a
+        single row, as between consecutive bars, only that row is added and
+        the oldest removed, which is O(N^2) instead of O(T*N^2). The sums
+        are rebuilt from scratch once the window has fully turned over, so
+        rounding error from the updates does not accumulate.
+        
+        Args:
+            values: Returns window of shape (T, N)
+            cols: Column labels of values
+            
+        Returns:
+            Correlation matrix of shape (N, N)
+        """
+        n = len(values)
+        if n < 2:
+            self._corr_state = None
+            return np.full((len(cols), len(cols)), np.nan)
+        
+        state = self._corr_state
+        add = drop = None
+        if state is not None and state['age'] < n and state['cols'].equals(cols):
+            prev = state['values']
+            if len(prev) == n and np.array_equal(prev[1:], values[:-1]):
+                add, drop = values[-1], prev[0]
+            elif len(prev) == n - 1 and np.array_equal(prev, values[:-1]):
+                add = values[-1]
+        
+        if add is None:
+            sx = values.sum(axis=0)
+            # SYRK only computes the upper triangle of R^T R, mirror it down.
+            # values.T is Fortran-ordered, so BLAS gets it without a copy
+            upper = dsyrk(1.0, values.T)
+            sxy = np.triu(upper) + np.triu(upper, 1).T
+            age = 0
+        else:
+            sx = state['sx'] + add
+            sxy = state['sxy'] + np.outer(add, add)
+            if drop is not None:
+                sx -= drop
+                sxy -= np.outer(drop, drop)
+            age = state['age'] + 1
+        self._corr_state = {'cols': cols, 'values': values, 'sx': sx, 'sxy': sxy, 'age': age}
+        
+        cov = sxy - np.outer(sx, sx) / n
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return np.clip(corr, -1, 1, out=corr)
     
     def find_correlated_pairs(
         self,
@@ -63,24 +252,39 @@ class DispersionStrategy:
         Returns:
             List of tuples (asset1, asset2, correlation)
         """
+        _, cols, corr = self._prep(prices)
+        i_idx, j_idx, vals = self._pair_indices(corr, min_correlation)
+        labels = cols.to_numpy()
+        return list(zip(labels[i_idx], labels[j_idx], vals))
+    
+    def _pair_indices(
+        self,
+        corr: np.ndarray,
+        min_correlation: float = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find correlated pairs from a precomputed correlation matrix.
+        
+        Args:
+            corr: Correlation matrix of shape (N, N)
+            min_correlation: Minimum correlation threshold (overrides instance default)
+            
+        Returns:
+            Tuple of (first column ids, second column ids, correlations),
+            strongest correlations first
+        """
         if min_correlation is None:
             min_correlation = self.min_correlation
-            
-        returns = prices.pct_change().dropna()
-        corr_matrix = returns.corr()
-        
-        pairs = []
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i + 1, len(corr_matrix.columns)):
-                corr = corr_matrix.iloc[i, j]
-                if abs(corr) >= min_correlation:
-                    pairs.append((
-                        corr_matrix.columns[i],
-                        corr_matrix.columns[j],
-                        corr
-                    ))
-        
-        return sorted(pairs, key=lambda x: abs(x[2]), reverse=True)
+        
+        # Scan the upper triangle in one shot
+        i_idx, j_idx = np.triu_indices(corr.shape[0], k=1)
+        vals = corr[i_idx, j_idx]
+        
+        mask = np.abs(vals) >= min_correlation
+        i_idx, j_idx, vals = i_idx[mask], j_idx[mask], vals[mask]
+        order = np.argsort(-np.abs(vals), kind='stable')
+        
+        return i_idx[order], j_idx[order], vals[order]
     
     def calculate_position_sizes(
         self,
@@ -97,18 +301,50 @@ class DispersionStrategy:
         Returns:
             Dictionary mapping symbols to position sizes
         """
-        returns = prices.pct_change().dropna()
-        volatilities = returns.std()
+        returns, cols, _ = self._prep(prices)
+        return self._position_sizes(returns, cols, portfolio_value)
+    
+    def _position_sizes(
+        self,
+        returns: np.ndarray,
+        cols: pd.Index,
+        portfolio_value: float
+    ) -> Dict[str, float]:
+        """Calculate position sizes from a precomputed returns array."""
+        if len(returns) < 2:
+            volatilities = np.full(len(cols), np.nan)
+        else:
+            volatilities = returns.std(axis=0, ddof=1)
         
         # Inverse volatility weighting
-        weights = 1 / volatilities
-        weights = weights / weights.sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = 1 / volatilities
+            weights /= weights.sum()
         
-        # Apply maximum position size constraint
-        weights = np.minimum(weights, self.max_position_size)
-        weights = weights / weights.sum()
+        # Apply maximum position size constraint by water-filling: weights
+        # above the cap are pinned to it and the excess is spread over the
+        # uncapped weights in proportion, until none exceeds the cap. When
+        # the cap cannot be met while fully invested the rest stays in cash
+        cap = self.max_position_size
+        n = len(weights)
+        if not np.isfinite(weights).all():
+            # Not enough history for a volatility, leave the NaNs in place
+            pass
+        elif cap * n <= 1:
+            # Every name ends up at the cap, the remainder is uninvested
+            weights = np.full(n, cap)
+        else:
+            capped = np.zeros(n, dtype=np.bool_)
+            while True:
+                over = ~capped & (weights > cap)
+                if not over.any():
+                    break
+                capped |= over
+                weights[capped] = cap
+                free = ~capped
+                weights[free] *= (1 - cap * np.count_nonzero(capped)) / weights[free].sum()
         
-        return {symbol: weight * portfolio_value for symbol, weight in weights.items()}
+        return dict(zip(cols, weights * portfolio_value))
     
     def generate_signals(
         self,
@@ -125,38 +361,35 @@ class DispersionStrategy:
         Returns:
             Dictionary of trading signals with position sizes
         """
-        dispersion = self.calculate_dispersion(prices)
-        pairs = self.find_correlated_pairs(prices)
-        position_sizes = self.calculate_position_sizes(prices, portfolio_value)
+        # Returns and correlations are computed once and shared by every helper below
+        returns, cols, corr = self._prep(prices)
+        i_arr, j_arr, _ = self._pair_indices(corr)
+        position_sizes = self._position_sizes(returns, cols, portfolio_value)
         
         signals = {}
-        for asset1, asset2, corr in pairs:
-            # Calculate relative strength
-            returns1 = prices[asset1].pct_change()
-            returns2 = prices[asset2].pct_change()
-            spread = returns1 - returns2
-            
-            # Generate signals based on spread z-score
-            z_score = (spread - spread.mean()) / spread.std()
-            
-            if z_score.iloc[-1] > 2:  # Short asset1, long asset2
-                signals[asset1] = {
-                    'side': 'SHORT',
-                    'size': position_sizes[asset1]
-                }
-                signals[asset2] = {
-                    'side': 'LONG',
-                    'size': position_sizes[asset2]
-                }
-            elif z_score.iloc[-1] < -2:  # Long asset1, short asset2
-                signals[asset1] = {
-                    'side': 'LONG',
-                    'size': position_sizes[asset1]
-                }
-                signals[asset2] = {
-                    'side': 'SHORT',
-                    'size': position_sizes[asset2]
-                }
+        if not len(i_arr):
+            return signals
+        
+        # Spread z-scores of every pair at once, shape (T, P)
+        spread = returns[:, i_arr] - returns[:, j_arr]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_last = (spread[-1] - spread.mean(axis=0)) / spread.std(axis=0, ddof=1)
+        
+        short_mask = z_last > 2  # Short asset1, long asset2
+        long_mask = z_last < -2  # Long asset1, short asset2
+        
+        labels = cols.to_numpy()
+        for k in np.flatnonzero(short_mask | long_mask):
+            asset1, asset2 = labels[i_arr[k]], labels[j_arr[k]]
+            side1, side2 = ('SHORT', 'LONG') if short_mask[k] else ('LONG', 'SHORT')
+            signals[asset1] = {
+                'side': side1,
+                'size': position_sizes[asset1]
+            }
+            signals[asset2] = {
+                'side': side2,
+                'size': position_sizes[asset2]
+            }
         
         return signals
     
@@ -164,8 +397,12 @@ class DispersionStrategy:
         """
         Run the strategy in live trading mode.
         
+        Between rebalances the broker client's event loop keeps running
+        until the next rebalance time, instead of blocking in time.sleep.
+        
         Args:
-            broker_client: Broker client instance for order execution
+            broker_client: Broker client instance for order execution,
+                providing wait_until(datetime)
         """
         while True:
             try:
@@ -176,42 +413,77 @@ class DispersionStrategy:
                 # Generate signals
                 signals = self.generate_signals(prices, portfolio_value)
                 
-                # Execute trades
+                # Open positions for newly signalled symbols
+                held = []
                 for symbol, signal in signals.items():
-                    if symbol not in self.positions:
-                        # Open new position
-                        order_id = broker_client.place_order(
+                    if symbol in self.positions:
+                        held.append(symbol)
+                        continue
+                    order_id = broker_client.place_order(
+                        symbol=symbol,
+                        quantity=signal['size'],
+                        side=signal['side']
+                    )
+                    if order_id:
+                        self.positions.add(
                             symbol=symbol,
                             quantity=signal['size'],
+                            entry_price=broker_client.get_last_price(symbol),
+                            entry_time=datetime.now(),
                             side=signal['side']
                         )
-                        if order_id:
-                            self.positions[symbol] = Position(
-                                symbol=symbol,
-                                quantity=signal['size'],
-                                entry_price=broker_client.get_last_price(symbol),
-                                entry_time=datetime.now(),
-                                side=signal['side']
-                            )
-                    else:
-                        # Check if we need to close position
-                        position = self.positions[symbol]
-                        if position.side != signal['side']:
-                            broker_client.close_position(symbol)
-                            del self.positions[symbol]
                 
-                # Sleep until next rebalance
-                time.sleep(self._get_sleep_time())
+                # Close held positions whose side flipped, compared in one shot
+                if held:
+                    new_side = np.array(
+                        [1 if signals[symbol]['side'] == 'LONG' else -1 for symbol in held],
+                        dtype=np.int8
+                    )
+                    flipped = self.positions.side[self.positions.rows(held)] != new_side
+                    for k in np.flatnonzero(flipped):
+                        broker_client.close_position(held[k])
+                        self.positions.remove(held[k])
+                
+                # Wait until next rebalance
+                broker_client.wait_until(self.next_rebalance_time())
                 
             except Exception as e:
                 print(f"Error in live trading: {e}")
-                time.sleep(60)  # Wait a minute before retrying
+                # Wait a minute before retrying
+                broker_client.wait_until(datetime.now().astimezone() + timedelta(minutes=1))
     
-    def _get_sleep_time(self) -> int:
-        """Calculate sleep time until next rebalance."""
+    def next_rebalance_time(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Calculate the next rebalance time.
+        
+        Daily rebalances fall on business days and weekly ones on Fridays,
+        both at 15:55 US/Eastern. Any other frequency rebalances at the top
+        of every hour.
+        
+        Args:
+            now: Reference time, defaults to the current time. Naive values
+                are taken as US/Eastern
+            
+        Returns:
+            Timezone-aware datetime of the next rebalance
+        """
+        if now is None:
+            now = pd.Timestamp.now(tz=_MARKET_TZ)
+        else:
+            now = pd.Timestamp(now)
+            now = now.tz_localize(_MARKET_TZ) if now.tz is None else now.tz_convert(_MARKET_TZ)
+        
         if self.rebalance_frequency == '1D':
-            return 24 * 60 * 60
+            offset = pd.offsets.BDay()
         elif self.rebalance_frequency == '1W':
-            return 7 * 24 * 60 * 60
+            offset = pd.offsets.Week(weekday=4)
         else:
-            return 60 * 60  # Default to 1 hour 
\ No newline at end of file
+            return (now.floor('h') + pd.Timedelta(hours=1)).to_pydatetime()
+        
+        # Step in wall-clock days so DST changes do not shift the rebalance time
+        day = now.normalize().tz_localize(None)
+        while True:
+            at = (day + _REBALANCE_TIME).tz_localize(_MARKET_TZ)
+            if at > now and offset.is_on_offset(day):
+                return at.to_pydatetime()
+            day += pd.Timedelta(days=1)
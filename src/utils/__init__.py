@@ -6,6 +6,7 @@ from .data_loader import DataLoader
 from .network_utils import (
     check_dns_connectivity,
     check_pihole_blocking,
+    invalidate_verify_cache,
     verify_yahoo_finance_connectivity
 )
 
@@ -13,5 +14,6 @@ __all__ = [
     'DataLoader',
     'check_dns_connectivity',
     'check_pihole_blocking',
+    'invalidate_verify_cache',
     'verify_yahoo_finance_connectivity'
 ] 
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Numba kernels for rolling statistics
+
+Inputs may be float32 to halve memory traffic; every accumulator is a
+float64 scalar so precision is only lost on load, not in the reductions.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, cache=True)
+def rolling_std(x, window, out):
+    """
+    Rolling sample standard deviation of each column.
+
+    Uses Welford's online update for the running mean and M2, with the
+    reverse update when a sample leaves the window, so each output is O(1)
+    and does not suffer the cancellation of a running sum of squares. The
+    accumulators are re-anchored with an exact two-pass sum over the window
+    once per window length, and whenever M2 collapses far below its recent
+    peak (the signature of cancellation after a large level shift), so
+    rounding error from the reverse update cannot linger. Like pandas, a
+    row is NaN unless the whole window is valid.
+
+    Args:
+        x: 2-D array of shape (T, N)
+        window: Rolling window size
+        out: Output array of shape (T, N)
+    """
+    n_rows, n_cols = x.shape
+    for c in prange(n_cols):
+        mean = 0.0
+        m2 = 0.0
+        peak = 0.0
+        count = 0
+        for t in range(n_rows):
+            v = x[t, c]
+            if not np.isnan(v):
+                count += 1
+                delta = v - mean
+                mean += delta / count
+                m2 += delta * (v - mean)
+            if t >= window:
+                old = x[t - window, c]
+                if not np.isnan(old):
+                    count -= 1
+                    if count == 0:
+                        mean = 0.0
+                        m2 = 0.0
+                    else:
+                        delta = old - mean
+                        mean -= delta / count
+                        m2 -= delta * (old - mean)
+
+            peak = max(peak, m2)
+            if count == window and (t % window == 0 or m2 < 1e-8 * peak):
+                start = t - window + 1
+                mean = 0.0
+                for k in range(start, t + 1):
+                    mean += x[k, c]
+                mean /= window
+                m2 = 0.0
+                for k in range(start, t + 1):
+                    m2 += (x[k, c] - mean) ** 2
+                peak = m2
+
+            if count == window and count > 1:
+                out[t, c] = np.sqrt(max(m2, 0.0) / (count - 1))
+            else:
+                out[t, c] = np.nan
+
+
+@njit(parallel=True, cache=True)
+def rolling_corr(x, window, out):
+    """
+    Rolling pairwise correlation matrix.
+
+    Keeps running sums Sx, Sy, Sxx, Syy and Sxy for every column pair and
+    updates them as samples enter and leave the window.
+
+    Args:
+        x: 2-D array of shape (T, N)
+        window: Rolling window size
+        out: Output array of shape (T, N, N)
+    """
+    n_rows, n_cols = x.shape
+    for i in prange(n_cols):
+        for j in range(i, n_cols):
+            sx = 0.0
+            sy = 0.0
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            count = 0
+            for t in range(n_rows):
+                a = float(x[t, i])
+                b = float(x[t, j])
+                if not (np.isnan(a) or np.isnan(b)):
+                    sx += a
+                    sy += b
+                    sxx += a * a
+                    syy += b * b
+                    sxy += a * b
+                    count += 1
+                if t >= window:
+                    a = float(x[t - window, i])
+                    b = float(x[t - window, j])
+                    if not (np.isnan(a) or np.isnan(b)):
+                        sx -= a
+                        sy -= b
+                        sxx -= a * a
+                        syy -= b * b
+                        sxy -= a * b
+                        count -= 1
+
+                r = np.nan
+                if count == window and count > 1:
+                    vx = sxx - sx * sx / count
+                    vy = syy - sy * sy / count
+                    if vx > 0.0 and vy > 0.0:
+                        r = (sxy - sx * sy / count) / np.sqrt(vx * vy)
+                        r = min(max(r, -1.0), 1.0)
+                out[t, i, j] = r
+                out[t, j, i] = r
+
+
+@njit(parallel=True, cache=True)
+def mask_ffill(x, mean, std, threshold, out, n_outliers):
+    """
+    Replace outliers and missing values with the last valid value.
+
+    A value is an outlier when |x - mean| > threshold * std for its column,
+    the same test as a z-score above threshold. Outliers and NaNs are both
+    forward-filled in the same pass, and stay NaN until a column's first
+    valid value.
+
+    Args:
+        x: 2-D array of shape (T, N)
+        mean: Column means, shape (N,)
+        std: Column standard deviations, shape (N,)
+        threshold: z-score above which a value is an outlier
+        out: Output array of shape (T, N)
+        n_outliers: Output, number of outliers replaced per column
+    """
+    n_rows, n_cols = x.shape
+    for c in prange(n_cols):
+        limit = threshold * std[c]
+        last = np.nan
+        count = 0
+        for t in range(n_rows):
+            v = x[t, c]
+            if not np.isnan(v):
+                if abs(v - mean[c]) > limit:
+                    count += 1
+                else:
+                    last = v
+            out[t, c] = last
+        n_outliers[c] = count
@@ -4,9 +4,12 @@ import yfinance as yf
 from typing import List, Optional, Union
 from datetime import datetime, timedelta
 import logging
-from .network_utils import verify_yahoo_finance_connectivity
+from .network_utils import verify_yahoo_finance_connectivity, invalidate_verify_cache
+from ._kernels import rolling_std, rolling_corr, mask_ffill
 import pytz
 import os
+import hashlib
+import json
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,62 @@ class DataLoader:
         """
         self.cache_dir = cache_dir
     
+    def _cache_path(
+        self,
+        symbols: List[str],
+        start_date: datetime,
+        end_date: datetime,
+        interval: str
+    ) -> str:
+        """Return the cache file stem for a fetch request."""
+        key = '|'.join(['-'.join(symbols), interval, str(start_date.date()), str(end_date.date())])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest())
+    
+    def _read_cache(self, path: str) -> pd.DataFrame:
+        """
+        Load a cached price panel.
+        
+        The values are memory-mapped copy-on-write, so only the pages that
+        are actually read are loaded from disk. The frame is writable like a
+        freshly fetched one, edits stay in memory and never reach the file.
+        
+        Args:
+            path: Cache file stem
+            
+        Returns:
+            DataFrame with a UTC DatetimeIndex and one column per symbol
+        """
+        with open(f"{path}.json") as f:
+            header = json.load(f)
+        values = np.load(f"{path}.npy", mmap_mode='c')
+        index = pd.to_datetime(np.asarray(header['index'], dtype=np.int64), unit='ns', utc=True)
+        index.name = header['index_name']
+        return pd.DataFrame(
+            values,
+            index=index,
+            columns=pd.Index(header['columns'], name=header['columns_name']),
+            copy=False
+        )
+    
+    def _write_cache(self, df: pd.DataFrame, path: str) -> None:
+        """
+        Store a price panel as a column-major .npy plus a JSON header.
+        
+        Args:
+            df: DataFrame with a UTC DatetimeIndex and one column per symbol
+            path: Cache file stem
+        """
+        np.save(f"{path}.npy", np.asfortranarray(df.to_numpy(dtype=np.float64)))
+        # The header is written last, a panel without one is never read
+        header = {
+            'columns': df.columns.tolist(),
+            'columns_name': df.columns.name,
+            'index': df.index.as_unit('ns').asi8.tolist(),
+            'index_name': df.index.name
+        }
+        with open(f"{path}.json", 'w') as f:
+            json.dump(header, f)
+    
     def fetch_data(
         self,
         symbols: List[str],
@@ -51,20 +110,9 @@ class DataLoader:
         
         # Check cache first
         if self.cache_dir:
-            cache_file = os.path.join(
-                self.cache_dir,
-                f"{'-'.join(symbols)}_{start_date.date()}_{end_date.date()}_{interval}.csv"
-            )
+            cache_file = self._cache_path(symbols, start_date, end_date, interval)
             try:
-                df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-                # Ensure index is timezone-aware
-                if not isinstance(df.index, pd.DatetimeIndex):
-                    df.index = pd.to_datetime(df.index, utc=True)
-                if hasattr(df.index, 'tz') and df.index.tz is not None:
-                    df.index = df.index.tz_convert('UTC')
-                else:
-                    df.index = df.index.tz_localize('UTC')
-                return df
+                return self._read_cache(cache_file)
             except FileNotFoundError:
                 pass
         
@@ -73,49 +121,46 @@ class DataLoader:
             logger.error("Failed to verify connectivity to Yahoo Finance. Please check your network settings and DNS configuration.")
             raise ConnectionError("Failed to connect to Yahoo Finance. Check DNS settings and PiHole configuration if applicable.")
         
-        # Fetch data for each symbol
-        dfs = []
-        for symbol in symbols:
-            try:
-                df = yf.download(
-                    symbol,
-                    start=start_date,
-                    end=end_date,
-                    interval=interval,
-                    progress=False
-                )
-                
-                # Ensure the index is a DatetimeIndex
-                if not isinstance(df.index, pd.DatetimeIndex):
-                    df.index = pd.to_datetime(df.index, utc=True)
-                
-                # Convert index to UTC if it has timezone info
-                if hasattr(df.index, 'tz') and df.index.tz is not None:
-                    df.index = df.index.tz_convert('UTC')
-                else:
-                    df.index = df.index.tz_localize('UTC')
-                
-                # Add symbol column
-                df['Symbol'] = symbol
-                dfs.append(df)
-                
-            except Exception as e:
-                logger.error(f"Error fetching data for {symbol}: {str(e)}")
-                continue
-        
-        if not dfs:
+        # Fetch all symbols in a single request
+        try:
+            raw = yf.download(
+                list(symbols),
+                start=start_date,
+                end=end_date,
+                interval=interval,
+                group_by='ticker',
+                threads=True,
+                progress=False
+            )
+        except Exception as e:
+            logger.error(f"Error fetching data for {symbols}: {str(e)}")
+            # The network may have gone away since the last successful check
+            invalidate_verify_cache()
+            raise ValueError("No data could be fetched for any symbol") from e
+        
+        if raw.empty:
             raise ValueError("No data could be fetched for any symbol")
         
-        # Combine all dataframes
-        df = pd.concat(dfs)
+        # Columns are (symbol, field) in yfinance's order; keep the close of
+        # each symbol, laid out in the requested order
+        df = raw.xs('Close', axis=1, level=1).reindex(columns=list(symbols))
+        df.columns.name = 'Symbol'
         
-        # Pivot to get symbols as columns
-        df = df.pivot(columns='Symbol', values='Close')
+        # Symbols yfinance could not fetch come back as all-NaN columns
+        failed = df.columns[df.isna().all()]
+        for symbol in failed:
+            logger.error(f"Error fetching data for {symbol}: no data returned")
+        df = df.drop(columns=failed)
+        if df.empty:
+            raise ValueError("No data could be fetched for any symbol")
+        
+        # Standardize the shared index to UTC once
+        df.index = df.index.tz_convert('UTC') if df.index.tz else df.index.tz_localize('UTC')
         
         # Cache data
         if self.cache_dir:
             os.makedirs(self.cache_dir, exist_ok=True)
-            df.to_csv(cache_file)
+            self._write_cache(df, cache_file)
         
         return df
     
@@ -155,17 +200,20 @@ class DataLoader:
         
         print(f"Data shape after removing rows with too many missing values: {data.shape}")
         
-        # Handle outliers using z-score, but be less aggressive
-        for column in data.columns:
-            z_scores = np.abs((data[column] - data[column].mean()) / data[column].std())
-            # Only remove extreme outliers (z-score > 5 instead of 3)
-            data.loc[z_scores > 5, column] = np.nan
+        # Handle outliers using z-score, but be less aggressive. Outliers are
+        # replaced by the last valid value in the same pass that fills gaps
+        values = data.to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(values, axis=0)
+            std = np.nanstd(values, axis=0, ddof=1)
+        filled = np.empty_like(values)
+        n_outliers = np.empty(values.shape[1], dtype=np.int64)
+        # Only remove extreme outliers (z-score > 5 instead of 3)
+        mask_ffill(values, mean, std, 5.0, filled, n_outliers)
+        data = pd.DataFrame(filled, index=data.index, columns=data.columns)
         
         print(f"Data shape after outlier removal: {data.shape}")
-        print(f"Missing values after outlier removal:\n{data.isnull().sum()}")
-        
-        # Fill remaining missing values
-        data = data.ffill()
+        print(f"Outliers replaced:\n{pd.Series(n_outliers, index=data.columns)}")
         
         print(f"Final data shape: {data.shape}")
         print(f"Final missing values:\n{data.isnull().sum()}")
@@ -188,7 +236,13 @@ class DataLoader:
             DataFrame with returns
         """
         if method == 'log':
-            return np.log(data / data.shift(1))
+            # One log pass and one subtraction, no shifted or quotient frames
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_prices = np.log(data.to_numpy(dtype=np.float64))
+            returns = np.empty_like(log_prices)
+            returns[:1] = np.nan
+            np.subtract(log_prices[1:], log_prices[:-1], out=returns[1:])
+            return pd.DataFrame(returns, index=data.index, columns=data.columns)
         else:
             return data.pct_change()
     
@@ -208,7 +262,16 @@ class DataLoader:
             DataFrame with volatility
         """
         returns = self.calculate_returns(data)
-        return returns.rolling(window=window).std() * np.sqrt(252)
+        values = returns.to_numpy(dtype=np.float32)
+        
+        volatility = np.empty(values.shape)
+        rolling_std(values, window, volatility)
+        
+        return pd.DataFrame(
+            volatility * np.sqrt(252),
+            index=returns.index,
+            columns=returns.columns
+        )
     
     def calculate_correlation(
         self,
@@ -226,4 +289,15 @@ class DataLoader:
             DataFrame with correlation matrix
         """
         returns = self.calculate_returns(data)
-        return returns.rolling(window=window).corr() 
\ No newline at end of file
+        values = returns.to_numpy(dtype=np.float32)
+        n_rows, n_cols = values.shape
+        
+        # One correlation matrix per row, NaN until the first full window
+        corr = np.empty((n_rows, n_cols, n_cols))
+        rolling_corr(values, window, corr)
+        
+        return pd.DataFrame(
+            corr.reshape(n_rows * n_cols, n_cols),
+            index=pd.MultiIndex.from_product([returns.index, returns.columns]),
+            columns=returns.columns
+        ) 
\ No newline at end of file
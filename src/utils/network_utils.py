@@ -1,117 +1,579 @@
-import socket
+import asyncio
+import asyncio.staggered
+import concurrent.futures
+import atexit
+import functools
+import ipaddress
+import itertools
+import threading
+import time
+import dns.asyncresolver
+import dns.exception
 import dns.resolver
-import requests
-from typing import List, Tuple
+import httpx
+from typing import Awaitable, Dict, FrozenSet, List, Optional, Sequence, Tuple, TypeVar, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
-def check_dns_connectivity(domains: List[str] = None) -> Tuple[bool, List[str]]:
+# Domains yfinance talks to
+_DEFAULT_DOMAINS = (
+    'fc.yahoo.com',
+    'query1.finance.yahoo.com',
+    'query2.finance.yahoo.com'
+)
+
+# The system resolver answers queries, these public resolvers are only
+# raced when it times out or fails
+_PUBLIC_NAMESERVERS = ('8.8.8.8', '1.1.1.1')
+_SYSTEM_DNS_LIFETIME = 2.0  # Seconds before falling back to the public resolvers
+_RESOLVERS: Optional[Tuple[Optional[dns.asyncresolver.Resolver], List[dns.asyncresolver.Resolver]]] = None
+
+# Checks run on one background event loop, so the HTTP client and its
+# keep-alive connections outlive a single call
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+_T = TypeVar('_T')
+
+# PiHole API calls share one keep-alive client. pi.hole is served over
+# cleartext HTTP/1.1, so HTTP/2 is not negotiated
+_HTTP: Optional[httpx.AsyncClient] = None
+_PIHOLE_API = 'http://pi.hole/admin/api.php'
+_PIHOLE_STATUS_TIMEOUT = httpx.Timeout(1.0, connect=0.5)  # Fail fast when there is no PiHole
+# Whether pi.hole answered the last status probe; an unreachable PiHole is
+# not probed again for _PIHOLE_DOWN_TTL seconds
+_PIHOLE_ALIVE = {'val': None, 'exp': 0.0}
+_PIHOLE_DOWN_TTL = 300
+_PIHOLE_QUERIES_TIMEOUT = httpx.Timeout(5.0, connect=1.0)  # The query log can be large
+# Query log status codes PiHole uses for blocked queries (gravity, regex,
+# blacklist, upstream and CNAME blocks)
+_PIHOLE_BLOCKED_STATUS = frozenset({1, 4, 5, 6, 7, 8, 9, 10, 11})
+# Blocked domains from the last query log fetch
+_PIHOLE_BLOCKED = {'domains': None, 'exp': 0.0}
+_PIHOLE_BLOCKED_TTL = 300
+
+# Last verify_yahoo_finance_connectivity result, see _VERIFY_TTL
+_VERIFY_CACHE = {'val': None, 'exp': 0.0}
+_VERIFY_TTL = {True: 60, False: 5}
+
+# Positive answers are kept for their TTL (at most 5 minutes), failures for 30s
+_DNS_CACHE: Dict[str, Tuple[Union[Tuple[str, ...], Exception], float]] = {}
+_DNS_MAX_TTL = 300
+_DNS_NEGATIVE_TTL = 30
+# Background task re-resolving the default domains shortly before their
+# cached answers expire, see _refresh_dns
+_DNS_REFRESHER: Optional[concurrent.futures.Future] = None
+_DNS_REFRESH_INTERVAL = 300  # Longest wait between refreshes
+_DNS_REFRESH_MARGIN = 5  # Seconds before expiry to refresh at
+_DNS_REFRESH_MIN = 5  # Shortest wait, bounds refreshes of very short TTLs
+
+# Happy eyeballs (RFC 8305): delay between starting connection attempts
+_CONNECT_STAGGER = 0.25
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop, starting its thread on first use."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='network-utils', daemon=True).start()
+            atexit.register(_shutdown)
+            _LOOP = loop
+    return _LOOP
+
+def _run(coro: Awaitable[_T]) -> _T:
+    """Run a coroutine on the background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+def _shutdown() -> None:
+    """Close the HTTP client and stop the background loop at exit."""
+    global _HTTP
+    if _DNS_REFRESHER is not None:
+        _DNS_REFRESHER.cancel()
+    if _HTTP is not None:
+        _run(_HTTP.aclose())
+        _HTTP = None
+    _LOOP.call_soon_threadsafe(_LOOP.stop)
+
+def _get_http() -> httpx.AsyncClient:
+    """Return the shared PiHole HTTP client."""
+    global _HTTP
+    if _HTTP is None:
+        _HTTP = httpx.AsyncClient(
+            timeout=httpx.Timeout(3.0, connect=1.0),
+            limits=httpx.Limits(max_keepalive_connections=4)
+        )
+    return _HTTP
+
+class _Sinkholed(dns.exception.DNSException):
+    """The system resolver answered with a blocking address."""
+
+def _get_resolvers() -> Tuple[Optional[dns.asyncresolver.Resolver], List[dns.asyncresolver.Resolver]]:
+    """
+    Return the shared resolvers, reading the system configuration once.
+    
+    Returns:
+        Tuple of (system resolver or None without a configuration,
+        public resolvers)
+    """
+    global _RESOLVERS
+    if _RESOLVERS is None:
+        system = None
+        try:
+            system = dns.asyncresolver.Resolver()
+            system.lifetime = _SYSTEM_DNS_LIFETIME
+        except dns.resolver.NoResolverConfiguration:
+            logger.warning("No system DNS configuration, using public resolvers only")
+        public = []
+        for nameserver in _PUBLIC_NAMESERVERS:
+            resolver = dns.asyncresolver.Resolver(configure=False)
+            resolver.nameservers = [nameserver]
+            public.append(resolver)
+        _RESOLVERS = (system, public)
+    return _RESOLVERS
+
+def _is_sinkhole(answer: dns.resolver.Answer) -> bool:
+    """Whether an A/AAAA answer holds a blocking address (0.0.0.0, ::, loopback)."""
+    for rdata in answer:
+        address = ipaddress.ip_address(rdata.address)
+        if address.is_unspecified or address.is_loopback:
+            return True
+    return False
+
+async def _query(domain: str, rdtype: str) -> dns.resolver.Answer:
+    """
+    Resolve a record through the system resolver.
+    
+    The system resolver is the one yfinance uses, so its NXDOMAIN or
+    sinkhole answer, such as a local PiHole blocking the domain, is the
+    result. Only when it times out, fails (SERVFAIL) or is not configured
+    is the query raced across the public resolvers instead.
+    
+    Args:
+        domain: Domain to resolve
+        rdtype: Record type to query
+        
+    Returns:
+        The answer
+        
+    Raises:
+        _Sinkholed: If the system resolver answered with a blocking address
+    """
+    system, public = _get_resolvers()
+    if system is not None:
+        try:
+            answer = await system.resolve(domain, rdtype)
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            raise
+        except dns.exception.DNSException as e:
+            logger.debug("System resolver failed for %s %s, trying public resolvers: %s", domain, rdtype, e)
+        else:
+            if _is_sinkhole(answer):
+                raise _Sinkholed(f"{domain} {rdtype} resolves to a blocking address")
+            return answer
+    return await _race(domain, rdtype, public)
+
+async def _race(
+    domain: str,
+    rdtype: str,
+    resolvers: List[dns.asyncresolver.Resolver]
+) -> dns.resolver.Answer:
+    """
+    Send the same query to several resolvers and return the first answer.
+    
+    A single slow or unresponsive resolver does not stall the query, it
+    only fails if every resolver fails.
+    
+    Args:
+        domain: Domain to resolve
+        rdtype: Record type to query
+        resolvers: Resolvers to race
+        
+    Returns:
+        The first successful answer
+    """
+    tasks = [asyncio.ensure_future(r.resolve(domain, rdtype)) for r in resolvers]
+    try:
+        error = None
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                return await next_done
+            except dns.exception.DNSException as e:
+                error = e
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # Mark failures of losing queries as retrieved
+
+def clear_dns_cache() -> None:
+    """Forget all cached DNS answers."""
+    _DNS_CACHE.clear()
+
+async def _resolve(domain: str) -> Tuple[str, ...]:
+    """
+    Resolve a domain's IPv6 and IPv4 addresses, using cached answers while fresh.
+    
+    A and AAAA are queried concurrently. Addresses are interleaved by family
+    starting with IPv6, the order happy eyeballs tries them in.
+    
+    Args:
+        domain: Domain to resolve
+        
+    Returns:
+        IP addresses as text
+        
+    Raises:
+        dns.exception.DNSException: If neither query returns an address,
+            also re-raised from the cache while the negative entry is fresh
+    """
+    entry = _DNS_CACHE.get(domain)
+    if entry is not None and entry[1] > time.monotonic():
+        if isinstance(entry[0], Exception):
+            raise entry[0].with_traceback(None)
+        return entry[0]
+    return await _lookup(domain)
+
+async def _lookup(domain: str) -> Tuple[str, ...]:
+    """Query a domain's addresses and store the outcome in _DNS_CACHE."""
+    now = time.monotonic()
+    results = await asyncio.gather(
+        _query(domain, 'AAAA'),
+        _query(domain, 'A'),
+        return_exceptions=True
+    )
+    answers = [result for result in results if not isinstance(result, BaseException)]
+    
+    # A blocked family fails the domain even if the other one resolves
+    for result in results:
+        if isinstance(result, _Sinkholed):
+            _DNS_CACHE[domain] = (result, now + _DNS_NEGATIVE_TTL)
+            raise result
+    
+    if not answers:
+        aaaa_error, a_error = results
+        if not isinstance(a_error, dns.exception.DNSException):
+            raise a_error
+        if isinstance(aaaa_error, dns.resolver.NXDOMAIN):
+            a_error = aaaa_error
+        if isinstance(a_error, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+            _DNS_CACHE[domain] = (a_error, now + _DNS_NEGATIVE_TTL)
+        raise a_error
+    
+    families = [[rdata.to_text() for rdata in answer] for answer in answers]
+    ips = tuple(
+        ip for group in itertools.zip_longest(*families) for ip in group if ip is not None
+    )
+    ttl = min(answer.rrset.ttl for answer in answers)
+    _DNS_CACHE[domain] = (ips, now + min(ttl, _DNS_MAX_TTL))
+    return ips
+
+async def _refresh_dns(domains: Sequence[str]) -> None:
+    """
+    Re-resolve domains shortly before their cached answers expire, forever.
+    
+    Each pass waits until _DNS_REFRESH_MARGIN seconds before the earliest
+    expiry among the domains' _DNS_CACHE entries, between _DNS_REFRESH_MIN
+    and _DNS_REFRESH_INTERVAL seconds. This keeps the entries fresh so a
+    check finds the answers cached instead of waiting on a DNS round trip.
+    An entry that has expired anyway is still resolved on demand by
+    _resolve.
+    """
+    while True:
+        now = time.monotonic()
+        expiry = min(
+            (_DNS_CACHE[domain][1] for domain in domains if domain in _DNS_CACHE),
+            default=now + _DNS_REFRESH_INTERVAL
+        )
+        delay = expiry - now - _DNS_REFRESH_MARGIN
+        await asyncio.sleep(min(max(delay, _DNS_REFRESH_MIN), _DNS_REFRESH_INTERVAL))
+        # Failures are recorded in _DNS_CACHE, the checks report them
+        await asyncio.gather(*(_lookup(domain) for domain in domains), return_exceptions=True)
+
+def _start_dns_refresher() -> None:
+    """Start refreshing the default domains on the background loop, once."""
+    global _DNS_REFRESHER
+    if _DNS_REFRESHER is None:
+        _DNS_REFRESHER = asyncio.run_coroutine_threadsafe(
+            _refresh_dns(_DEFAULT_DOMAINS), _get_loop()
+        )
+
+async def _try_connect(ip: str, port: int = 443, timeout: float = 5) -> bool:
+    """
+    Open and cleanly close a TCP connection without blocking the loop.
+    
+    Args:
+        ip: Address to connect to
+        port: Port to connect to
+        timeout: Seconds to wait for the handshake
+        
+    Returns:
+        bool: True if the connection was established
+    """
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+async def _connect_any(ips: Tuple[str, ...], port: int = 443) -> Optional[str]:
+    """
+    Race connections to several addresses, starting one every 250ms or as
+    soon as the previous attempt fails.
+    
+    Args:
+        ips: Addresses in the order to try them
+        port: Port to connect to
+        
+    Returns:
+        The first address that accepted a connection, None if none did
+    """
+    async def attempt(ip: str) -> str:
+        # staggered_race only counts attempts that return, a failed one
+        # raises so the next address is tried without waiting out the delay
+        if not await _try_connect(ip, port):
+            raise ConnectionError(ip)
+        return ip
+    
+    winner, _, _ = await asyncio.staggered.staggered_race(
+        [functools.partial(attempt, ip) for ip in ips],
+        _CONNECT_STAGGER
+    )
+    return winner
+
+async def _check_one(domain: str, deep_check: bool = False) -> Optional[str]:
+    """
+    Resolve a domain and optionally open a TCP connection to port 443.
+    
+    Args:
+        domain: Domain to check
+        deep_check: Also require a TCP connection to one of its addresses
+        
+    Returns:
+        The domain if the check failed, None otherwise
+    """
+    try:
+        # Try DNS resolution
+        ips = await _resolve(domain)
+        
+        # Try HTTP connection over whichever address family answers first
+        if deep_check and await _connect_any(ips) is None:
+            logger.warning("Connection failed for %s (IPs: %s)", domain, ', '.join(ips))
+            return domain
+        
+    except dns.exception.DNSException as e:
+        logger.warning("DNS resolution error for %s: %s", domain, e)
+        return domain
+    except OSError as e:
+        logger.warning("Error checking %s: %s", domain, e)
+        return domain
+    
+    return None
+
+async def _check_dns_async(domains: Sequence[str], deep_check: bool = False) -> List[str]:
+    """Check all domains concurrently and return the ones that failed."""
+    results = await asyncio.gather(*(_check_one(domain, deep_check) for domain in domains))
+    return [domain for domain in results if domain is not None]
+
+def check_dns_connectivity(
+    domains: Optional[Sequence[str]] = None,
+    deep_check: bool = False
+) -> Tuple[bool, List[str]]:
     """
     Check DNS connectivity for specified domains.
     
+    All domains are checked concurrently, so the check takes about as long
+    as the slowest domain rather than the sum of all.
+    
     Args:
-        domains: List of domains to check. If None, uses default list.
+        domains: Domains to check. If None, uses the Yahoo Finance defaults.
+        deep_check: Also open a TCP connection to port 443 of each domain.
+            By default a DNS answer counts as success, the HTTPS request
+            that follows will surface anything beyond that.
         
     Returns:
         Tuple of (is_connected, list_of_failed_domains)
     """
     if domains is None:
-        domains = [
-            'fc.yahoo.com',
-            'query1.finance.yahoo.com',
-            'query2.finance.yahoo.com'
-        ]
+        domains = _DEFAULT_DOMAINS
     
-    failed_domains = []
-    
-    for domain in domains:
-        try:
-            # Try DNS resolution
-            answers = dns.resolver.resolve(domain, 'A')
-            if not answers:
-                failed_domains.append(domain)
-                logger.warning(f"DNS resolution failed for {domain}")
-                continue
-                
-            # Try HTTP connection
-            ip = answers[0].to_text()
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            result = sock.connect_ex((ip, 443))
-            sock.close()
-            
-            if result != 0:
-                failed_domains.append(domain)
-                logger.warning(f"Connection failed for {domain} (IP: {ip})")
-                
-        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.Timeout) as e:
-            failed_domains.append(domain)
-            logger.warning(f"DNS resolution error for {domain}: {str(e)}")
-        except Exception as e:
-            failed_domains.append(domain)
-            logger.warning(f"Error checking {domain}: {str(e)}")
+    failed_domains = _run(_check_dns_async(domains, deep_check))
     
     return len(failed_domains) == 0, failed_domains
 
-def check_pihole_blocking(domains: List[str] = None) -> Tuple[bool, List[str]]:
+async def _fetch_pihole_blocked() -> Optional[FrozenSet[str]]:
+    """
+    Fetch the set of domains PiHole has recently blocked.
+    
+    The status probe and the query log request are sent concurrently.
+    
+    Returns:
+        Blocked domains from the query log, None if PiHole is unreachable,
+        disabled or returned something unexpected
+    """
+    if _PIHOLE_ALIVE['val'] is False and time.monotonic() < _PIHOLE_ALIVE['exp']:
+        return None
+    
+    http = _get_http()
+    status, queries = await asyncio.gather(
+        http.get(f'{_PIHOLE_API}?status', timeout=_PIHOLE_STATUS_TIMEOUT),
+        http.get(f'{_PIHOLE_API}?getAllQueries', timeout=_PIHOLE_QUERIES_TIMEOUT),
+        return_exceptions=True
+    )
+    for result in (status, queries):
+        if isinstance(result, BaseException) and not isinstance(result, httpx.HTTPError):
+            raise result
+    
+    if isinstance(status, (httpx.ConnectError, httpx.TimeoutException)):
+        # No PiHole on this network, don't pay the lookup and connect again
+        _PIHOLE_ALIVE['val'] = False
+        _PIHOLE_ALIVE['exp'] = time.monotonic() + _PIHOLE_DOWN_TTL
+        return None
+    if isinstance(status, httpx.HTTPError):
+        # If we can't connect to PiHole API, assume it's not running
+        return None
+    _PIHOLE_ALIVE['val'] = True
+    
+    try:
+        if status.status_code != 200:
+            return None
+        payload = status.json()
+        if not isinstance(payload, dict) or payload.get('status') != 'enabled':
+            return None
+        
+        # PiHole went away mid-check, treat the domains as not blocked
+        if isinstance(queries, httpx.HTTPError) or queries.status_code != 200:
+            return None
+        payload = queries.json()
+        # Without an API token PiHole answers getAllQueries with a bare []
+        if not isinstance(payload, dict):
+            return None
+        rows = payload.get('data', [])
+    except (AttributeError, TypeError, ValueError):
+        return None
+    
+    # Rows are [timestamp, type, domain, client, status, ...]
+    try:
+        blocked = frozenset(row[2] for row in rows if int(row[4]) in _PIHOLE_BLOCKED_STATUS)
+    except (IndexError, TypeError, ValueError) as e:
+        logger.warning("Unexpected PiHole query log format: %s", e)
+        return None
+    
+    _PIHOLE_BLOCKED['domains'] = blocked
+    _PIHOLE_BLOCKED['exp'] = time.monotonic() + _PIHOLE_BLOCKED_TTL
+    return blocked
+
+async def _check_pihole_async(domains: Sequence[str]) -> List[str]:
+    """Return the domains PiHole has recently blocked."""
+    # The cached set is a query log snapshot, not the blocklist: a domain in
+    # it was blocked, a domain missing from it may not have been queried yet
+    blocked = _PIHOLE_BLOCKED['domains']
+    if (
+        blocked is None
+        or time.monotonic() >= _PIHOLE_BLOCKED['exp']
+        or blocked.isdisjoint(domains)
+    ):
+        blocked = await _fetch_pihole_blocked()
+        if blocked is None:
+            return []
+    
+    blocked_domains = []
+    for domain in domains:
+        if domain in blocked:
+            blocked_domains.append(domain)
+            logger.warning("Domain %s appears to be blocked by PiHole", domain)
+    return blocked_domains
+
+def check_pihole_blocking(domains: Optional[Sequence[str]] = None) -> Tuple[bool, List[str]]:
     """
     Check if domains are being blocked by PiHole.
     
+    The blocked set from the last query log fetch is kept for 5 minutes.
+    Domains found in it are reported as blocked without contacting PiHole,
+    otherwise the query log is fetched again.
+    
     Args:
-        domains: List of domains to check. If None, uses default list.
+        domains: Domains to check. If None, uses the Yahoo Finance defaults.
         
     Returns:
         Tuple of (is_blocked, list_of_blocked_domains)
     """
     if domains is None:
-        domains = [
-            'fc.yahoo.com',
-            'query1.finance.yahoo.com',
-            'query2.finance.yahoo.com'
-        ]
-    
-    blocked_domains = []
+        domains = _DEFAULT_DOMAINS
     
-    for domain in domains:
-        try:
-            # Try to connect to PiHole API
-            response = requests.get('http://pi.hole/admin/api.php?status')
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'enabled':
-                    # Check if domain is in blocklist
-                    block_response = requests.get(f'http://pi.hole/admin/api.php?getAllQueries&domain={domain}')
-                    if block_response.status_code == 200:
-                        block_data = block_response.json()
-                        if block_data.get('data', []):
-                            blocked_domains.append(domain)
-                            logger.warning(f"Domain {domain} appears to be blocked by PiHole")
-        except requests.RequestException:
-            # If we can't connect to PiHole API, assume it's not running
-            pass
-        except Exception as e:
-            logger.warning(f"Error checking PiHole for {domain}: {str(e)}")
+    blocked_domains = _run(_check_pihole_async(domains))
     
     return len(blocked_domains) > 0, blocked_domains
 
+def invalidate_verify_cache() -> None:
+    """
+    Force the next verify_yahoo_finance_connectivity call to re-check.
+    
+    The cached DNS answers and PiHole state are dropped as well, so the
+    re-check sees the network as it is now.
+    """
+    _VERIFY_CACHE['val'] = None
+    _VERIFY_CACHE['exp'] = 0.0
+    _PIHOLE_ALIVE['val'] = None
+    _PIHOLE_ALIVE['exp'] = 0.0
+    _PIHOLE_BLOCKED['domains'] = None
+    _PIHOLE_BLOCKED['exp'] = 0.0
+    clear_dns_cache()
+
 def verify_yahoo_finance_connectivity() -> bool:
     """
     Verify connectivity to Yahoo Finance domains.
     
+    The result is reused for 60 seconds after a success and 5 seconds after
+    a failure, see invalidate_verify_cache(). The first call also starts
+    re-resolving the Yahoo Finance domains in the background before their
+    answers expire, so later checks are answered from the DNS cache.
+    
     Returns:
         bool: True if all checks pass, False otherwise
     """
-    # Check DNS connectivity
-    dns_ok, failed_dns = check_dns_connectivity()
-    if not dns_ok:
-        logger.error(f"DNS connectivity issues detected for: {', '.join(failed_dns)}")
-        return False
+    if time.monotonic() < _VERIFY_CACHE['exp']:
+        return _VERIFY_CACHE['val']
     
-    # Check PiHole blocking
-    pihole_blocked, blocked_domains = check_pihole_blocking()
-    if pihole_blocked:
-        logger.error(f"Domains appear to be blocked by PiHole: {', '.join(blocked_domains)}")
-        return False
+    _start_dns_refresher()
+    result = _run(_verify())
+    _VERIFY_CACHE['val'] = result
+    _VERIFY_CACHE['exp'] = time.monotonic() + _VERIFY_TTL[result]
+    return result
+
+async def _verify() -> bool:
+    """
+    Run the DNS and PiHole checks concurrently.
+    
+    Each check is logged on its own, an error in one does not cancel the
+    other.
+    """
+    failed_dns, blocked_domains = await asyncio.gather(
+        _check_dns_async(_DEFAULT_DOMAINS),
+        _check_pihole_async(_DEFAULT_DOMAINS),
+        return_exceptions=True
+    )
+    
+    ok = True
+    if isinstance(failed_dns, Exception):
+        logger.error("DNS connectivity check failed: %s", failed_dns)
+        ok = False
+    elif failed_dns:
+        logger.error("DNS connectivity issues detected for: %s", ', '.join(failed_dns))
+        ok = False
+    
+    if isinstance(blocked_domains, Exception):
+        logger.error("PiHole check failed: %s", blocked_domains)
+        ok = False
+    elif blocked_domains:
+        logger.error("Domains appear to be blocked by PiHole: %s", ', '.join(blocked_domains))
+        ok = False
     
-    return True 
\ No newline at end of file
+    return ok
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+
+import src.utils.data_loader as data_loader
+from src.utils.data_loader import DataLoader
+
+
+def make_prices() -> pd.DataFrame:
+    index = pd.date_range('2024-01-01', periods=5, freq='D', tz='UTC', name='Date').as_unit('ns')
+    columns = pd.Index(['SPY', 'QQQ'], name='Symbol')
+    return pd.DataFrame(np.arange(10, dtype=np.float64).reshape(5, 2), index=index, columns=columns)
+
+
+def test_cache_round_trip(tmp_path):
+    loader = DataLoader(cache_dir=str(tmp_path))
+    prices = make_prices()
+    path = str(tmp_path / 'panel')
+    loader._write_cache(prices, path)
+    
+    pd.testing.assert_frame_equal(loader._read_cache(path), prices, check_freq=False)
+
+
+def test_cache_hit_is_writable_and_leaves_file_untouched(tmp_path):
+    loader = DataLoader(cache_dir=str(tmp_path))
+    prices = make_prices()
+    path = str(tmp_path / 'panel')
+    loader._write_cache(prices, path)
+    
+    cached = loader._read_cache(path)
+    cached.iloc[0, 0] = -1.0
+    assert cached.iloc[0, 0] == -1.0
+    assert loader._read_cache(path).iloc[0, 0] == prices.iloc[0, 0]
+
+
+def test_fetch_data_keeps_requested_symbol_order(monkeypatch):
+    index = pd.date_range('2024-01-01', periods=3, freq='D', name='Date')
+    columns = pd.MultiIndex.from_product([['QQQ', 'SPY'], ['Close', 'Volume']])
+    raw = pd.DataFrame(np.arange(12, dtype=np.float64).reshape(3, 4), index=index, columns=columns)
+    monkeypatch.setattr(data_loader, 'verify_yahoo_finance_connectivity', lambda: True)
+    monkeypatch.setattr(data_loader.yf, 'download', lambda *args, **kwargs: raw)
+    
+    df = DataLoader().fetch_data(['SPY', 'XLF', 'QQQ'], datetime(2024, 1, 1), datetime(2024, 1, 4))
+    
+    assert df.columns.tolist() == ['SPY', 'QQQ']
+    np.testing.assert_array_equal(df['SPY'], raw[('SPY', 'Close')])
@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timezone
+
+from src.strategy.dispersion import DispersionStrategy, Position, PositionsStore
+
+
+def make_returns(n_rows: int, n_cols: int, seed: int = 0) -> np.ndarray:
+    """Returns with a different volatility per column."""
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_rows, n_cols)) * rng.uniform(0.005, 0.05, n_cols)
+
+
+@pytest.mark.parametrize('n_cols', [1, 3, 5, 10, 11, 40])
+def test_position_sizes_respect_cap(n_cols):
+    strategy = DispersionStrategy(max_position_size=0.1)
+    cols = pd.Index([f"S{i}" for i in range(n_cols)])
+    sizes = strategy._position_sizes(make_returns(60, n_cols), cols, 1.0)
+    weights = np.array(list(sizes.values()))
+    
+    assert weights.max() <= 0.1 + 1e-12
+    assert weights.sum() == pytest.approx(min(1.0, 0.1 * n_cols))
+
+
+def test_position_sizes_below_cap_are_inverse_volatility():
+    strategy = DispersionStrategy(max_position_size=1.0)
+    returns = make_returns(60, 4)
+    cols = pd.Index(['A', 'B', 'C', 'D'])
+    sizes = strategy._position_sizes(returns, cols, 1.0)
+    
+    inv_vol = 1 / returns.std(axis=0, ddof=1)
+    np.testing.assert_allclose(list(sizes.values()), inv_vol / inv_vol.sum())
+
+
+def test_position_sizes_without_history_are_nan():
+    strategy = DispersionStrategy()
+    sizes = strategy._position_sizes(make_returns(1, 3), pd.Index(['A', 'B', 'C']), 1.0)
+    assert np.isnan(list(sizes.values())).all()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_position_sizes_water_filling(seed):
+    # Volatilities spanning two orders of magnitude need several rounds
+    rng = np.random.default_rng(seed)
+    n_cols = 25
+    returns = rng.normal(size=(60, n_cols)) * np.geomspace(0.001, 0.1, n_cols)
+    cap = 0.08
+    strategy = DispersionStrategy(max_position_size=cap)
+    cols = pd.Index([f"S{i}" for i in range(n_cols)])
+    weights = np.array(list(strategy._position_sizes(returns, cols, 1.0).values()))
+    
+    assert weights.max() <= cap + 1e-12
+    assert weights.sum() == pytest.approx(1.0)
+    
+    # Uncapped names keep their inverse volatility proportions
+    free = weights < cap - 1e-12
+    inv_vol = 1 / returns.std(axis=0, ddof=1)
+    np.testing.assert_allclose(weights[free] / inv_vol[free], (weights[free] / inv_vol[free])[0])
+
+
+def check_corr(corr: np.ndarray, values: np.ndarray) -> None:
+    np.testing.assert_allclose(corr, np.corrcoef(values, rowvar=False), atol=1e-10)
+
+
+def test_rolling_corr_growing_window():
+    strategy = DispersionStrategy()
+    values = make_returns(30, 5)
+    cols = pd.Index(list('ABCDE'))
+    for n in range(2, 31):
+        check_corr(strategy._rolling_corr(values[:n], cols), values[:n])
+    assert strategy._corr_state['age'] > 0
+
+
+def test_rolling_corr_sliding_window_with_forced_rebuild():
+    strategy = DispersionStrategy()
+    values = make_returns(200, 5, seed=1)
+    cols = pd.Index(list('ABCDE'))
+    window = 20
+    ages = []
+    for t in range(window, len(values) + 1):
+        check_corr(strategy._rolling_corr(values[t - window:t], cols), values[t - window:t])
+        ages.append(strategy._corr_state['age'])
+    
+    # One-row slides update incrementally, a full turnover rebuilds
+    assert max(ages) == window
+    assert ages.count(0) > 1
+
+
+def test_rolling_corr_window_with_dropped_nan_row():
+    strategy = DispersionStrategy()
+    index = pd.date_range('2024-01-01', periods=60, freq='D', tz='UTC')
+    rng = np.random.default_rng(2)
+    prices = pd.DataFrame(
+        100 * np.exp(np.cumsum(rng.normal(scale=0.01, size=(60, 4)), axis=0)),
+        index=index,
+        columns=list('ABCD')
+    )
+    prices.iloc[30, 2] = np.nan
+    
+    window = 15
+    for t in range(window, len(prices) + 1):
+        values, cols, corr = strategy._prep(prices.iloc[t - window:t])
+        expected = prices.iloc[t - window:t].pct_change(fill_method=None).dropna().to_numpy()
+        np.testing.assert_allclose(values, expected)
+        check_corr(corr, expected)
+
+
+def test_rolling_corr_resets_on_new_columns():
+    strategy = DispersionStrategy()
+    values = make_returns(20, 4)
+    strategy._rolling_corr(values[:19], pd.Index(list('ABCD')))
+    corr = strategy._rolling_corr(values[1:], pd.Index(list('WXYZ')))
+    check_corr(corr, values[1:])
+    assert strategy._corr_state['age'] == 0
+
+
+def test_positions_store_add_get_and_grow():
+    store = PositionsStore(capacity=2)
+    opened = datetime(2024, 1, 2, 15, 55, tzinfo=timezone.utc)
+    for k, symbol in enumerate(['A', 'B', 'C', 'D', 'E']):
+        store.add(symbol, 10.0 + k, 100.0 + k, opened, 'LONG' if k % 2 == 0 else 'SHORT')
+    
+    assert len(store) == 5 and len(store.quantity) >= 5
+    assert 'C' in store and 'Z' not in store
+    position = store.get('D')
+    assert position == Position('D', 13.0, 103.0, position.entry_time, 'SHORT')
+    assert pd.Timestamp(position.entry_time) == pd.Timestamp(opened).tz_localize(None)
+    assert store.get('Z') is None
+
+
+def test_positions_store_remove_keeps_rows_packed():
+    store = PositionsStore()
+    opened = datetime(2024, 1, 2)
+    for k, symbol in enumerate(['A', 'B', 'C', 'D']):
+        store.add(symbol, float(k), 100.0 + k, opened, 'LONG')
+    
+    store.remove('B')  # 'D' moves into the freed row
+    store.remove('D')  # Removing the last row moves nothing
+    
+    assert store.symbols == ['A', 'C']
+    np.testing.assert_array_equal(store.rows(['C', 'A']), [1, 0])
+    np.testing.assert_array_equal(store.quantity[:len(store)], [0.0, 2.0])
+    assert store.get('C').entry_price == 102.0
+    
+    store.add('E', 4.0, None, opened, 'SHORT')
+    assert np.isnan(store.get('E').entry_price) and store.get('E').side == 'SHORT'
+    with pytest.raises(KeyError):
+        store.remove('B')
+
+
+def eastern(*args) -> pd.Timestamp:
+    return pd.Timestamp(datetime(*args)).tz_localize('US/Eastern')
+
+
+@pytest.mark.parametrize('frequency, now, expected', [
+    # Business days at 15:55 ET
+    ('1D', eastern(2024, 3, 4, 10, 0), eastern(2024, 3, 4, 15, 55)),
+    ('1D', eastern(2024, 3, 4, 15, 55), eastern(2024, 3, 5, 15, 55)),
+    ('1D', eastern(2024, 3, 1, 16, 0), eastern(2024, 3, 4, 15, 55)),
+    ('1D', eastern(2024, 3, 2, 12, 0), eastern(2024, 3, 4, 15, 55)),
+    # Across the spring DST change the wall-clock time stays 15:55
+    ('1D', eastern(2024, 3, 8, 16, 0), eastern(2024, 3, 11, 15, 55)),
+    # Fridays at 15:55 ET
+    ('1W', eastern(2024, 3, 6, 9, 0), eastern(2024, 3, 8, 15, 55)),
+    ('1W', eastern(2024, 3, 8, 16, 0), eastern(2024, 3, 15, 15, 55)),
+    # Anything else, top of the next hour
+    ('1H', eastern(2024, 3, 6, 10, 20), eastern(2024, 3, 6, 11, 0)),
+])
+def test_next_rebalance_time(frequency, now, expected):
+    strategy = DispersionStrategy(rebalance_frequency=frequency)
+    at = strategy.next_rebalance_time(now.to_pydatetime())
+    assert pd.Timestamp(at) == expected
+    assert (at.hour, at.minute) == (expected.hour, expected.minute)
+
+
+def test_next_rebalance_time_timezones():
+    strategy = DispersionStrategy(rebalance_frequency='1D')
+    expected = eastern(2024, 3, 4, 15, 55)
+    # Naive times are US/Eastern, aware ones are converted
+    assert pd.Timestamp(strategy.next_rebalance_time(datetime(2024, 3, 4, 10, 0))) == expected
+    assert pd.Timestamp(strategy.next_rebalance_time(datetime(2024, 3, 4, 20, 0, tzinfo=timezone.utc))) == expected
+    assert pd.Timestamp(strategy.next_rebalance_time(datetime(2024, 3, 4, 21, 0, tzinfo=timezone.utc))) == eastern(2024, 3, 5, 15, 55)
+
+
+def test_next_rebalance_time_defaults_to_now():
+    at = pd.Timestamp(DispersionStrategy().next_rebalance_time())
+    assert at > pd.Timestamp.now(tz='US/Eastern')
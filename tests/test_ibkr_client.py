@@ -0,0 +1,187 @@
+import time
+import pytest
+
+pytest.importorskip('ib_insync')
+
+from ib_insync import AccountValue, MarketOrder, OrderStatus, Position, Stock
+from src.broker.ibkr_client import IBKRClient
+
+
+class FakeTrade:
+    """Trade that reaches a final status after a number of updates."""
+    
+    def __init__(self, updates_until_done: int, final_status: str = 'Filled'):
+        self.remaining = updates_until_done
+        self.final_status = final_status
+        self.order = MarketOrder('BUY', 10)
+        self.order.orderId = 7
+        self.orderStatus = OrderStatus(status='Submitted')
+        self.advance(0)
+    
+    def advance(self, updates: int) -> None:
+        self.remaining -= updates
+        if self.remaining <= 0:
+            self.orderStatus.status = self.final_status
+    
+    def isDone(self) -> bool:
+        return self.orderStatus.status in OrderStatus.DoneStates
+
+
+class FakeIB:
+    """IB stand-in whose updates advance a single trade."""
+    
+    def __init__(self, trade: FakeTrade = None, advances: bool = True):
+        self.trade = trade
+        self.advances = advances
+        self.waits = 0
+        self.cancelled = []
+    
+    def placeOrder(self, contract, order):
+        return self.trade
+    
+    def positions(self, *args):
+        return [Position('DU1', Stock('SPY', 'SMART', 'USD'), -5.0, 400.0)]
+    
+    def cancelOrder(self, order):
+        self.cancelled.append(order)
+    
+    def waitOnUpdate(self, timeout: float = 0) -> bool:
+        self.waits += 1
+        if self.advances:
+            self.trade.advance(1)
+        else:
+            time.sleep(min(timeout, 0.01))
+        return True
+
+
+def make_client(ib: FakeIB, order_timeout: float = 30.0) -> IBKRClient:
+    client = IBKRClient(order_timeout=order_timeout)
+    client.ib = ib
+    return client
+
+
+def make_trading_client(ib: FakeIB, order_timeout: float = 30.0) -> IBKRClient:
+    client = make_client(ib, order_timeout)
+    client.connected = True
+    client._contracts['SPY'] = Stock('SPY', 'SMART', 'USD', conId=756733)
+    return client
+
+
+def test_wait_for_fill_returns_immediately_when_done():
+    trade = FakeTrade(0)
+    ib = FakeIB(trade)
+    assert make_client(ib)._wait_for_fill(trade)
+    assert ib.waits == 0
+
+
+def test_wait_for_fill_waits_for_updates_until_done():
+    trade = FakeTrade(3)
+    ib = FakeIB(trade)
+    assert make_client(ib)._wait_for_fill(trade)
+    assert ib.waits == 3
+
+
+def test_wait_for_fill_times_out_and_cancels():
+    trade = FakeTrade(1)
+    ib = FakeIB(trade, advances=False)
+    client = make_client(ib, order_timeout=0.05)
+    start = time.monotonic()
+    assert not client._wait_for_fill(trade)
+    assert time.monotonic() - start < 1.0
+    assert ib.cancelled == [trade.order]
+
+
+@pytest.mark.parametrize('status', ['Cancelled', 'ApiCancelled'])
+def test_cancelled_order_is_not_a_fill(status):
+    trade = FakeTrade(2, final_status=status)
+    ib = FakeIB(trade)
+    client = make_trading_client(ib)
+    assert client.place_order('SPY', 10, 'BUY') is None
+    assert ib.cancelled == []
+
+
+def test_filled_order_returns_order_id():
+    client = make_trading_client(FakeIB(FakeTrade(2)))
+    assert client.place_order('SPY', 10, 'BUY') == 7
+
+
+def test_place_order_timeout_cancels_order():
+    trade = FakeTrade(1)
+    ib = FakeIB(trade, advances=False)
+    client = make_trading_client(ib, order_timeout=0.05)
+    assert client.place_order('SPY', 10, 'BUY') is None
+    assert ib.cancelled == [trade.order]
+
+
+@pytest.mark.parametrize('status, closed', [('Filled', True), ('Cancelled', False)])
+def test_close_position_requires_fill(status, closed):
+    client = make_trading_client(FakeIB(FakeTrade(1, final_status=status)))
+    assert client.close_position('SPY') is closed
+
+
+class QualifyingIB:
+    """IB stand-in that only qualifies the given symbols."""
+    
+    def __init__(self, known):
+        self.known = set(known)
+        self.requests = []
+    
+    def qualifyContracts(self, *contracts):
+        self.requests.append([contract.symbol for contract in contracts])
+        for contract in contracts:
+            if contract.symbol in self.known:
+                contract.conId = hash(contract.symbol) & 0xFFFF or 1
+        return [contract for contract in contracts if contract.conId]
+
+
+def test_qualify_only_caches_qualified_contracts():
+    ib = QualifyingIB({'SPY'})
+    client = make_client(ib)
+    client._qualify(['SPY', 'QQQ'])
+    assert set(client._contracts) == {'SPY'}
+    
+    # A transient failure is retried on the next call
+    ib.known.add('QQQ')
+    client._qualify(['SPY', 'QQQ'])
+    assert ib.requests == [['SPY', 'QQQ'], ['QQQ']]
+    assert set(client._contracts) == {'SPY', 'QQQ'}
+
+
+def test_contract_raises_for_unqualified_symbol():
+    client = make_client(QualifyingIB(set()))
+    with pytest.raises(ValueError):
+        client._contract('NOPE')
+
+
+class AccountIB:
+    """IB stand-in pushing NetLiquidation after a number of updates."""
+    
+    def __init__(self, client, updates_until_value):
+        self.client = client
+        self.remaining = updates_until_value
+    
+    def accountSummary(self):
+        return []
+    
+    def waitOnUpdate(self, timeout: float = 0) -> bool:
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.client._on_account_summary(AccountValue('DU1', 'NetLiquidation', '12345.5', 'USD', ''))
+        else:
+            time.sleep(min(timeout, 0.01))
+        return True
+
+
+def test_portfolio_value_waits_for_first_net_liquidation():
+    client = IBKRClient()
+    client.ib = AccountIB(client, 2)
+    client.connected = True
+    assert client.get_portfolio_value() == 12345.5
+
+
+def test_portfolio_value_raises_when_net_liquidation_never_arrives():
+    client = IBKRClient(account_timeout=0.05)
+    client.ib = AccountIB(client, -1)
+    client.connected = True
+    with pytest.raises(TimeoutError):
+        client.get_portfolio_value()
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+pytest.importorskip('numba')
+
+from src.utils._kernels import rolling_std, rolling_corr, mask_ffill
+from src.strategy._kernels import row_std
+from src.backtest._kernels import step
+
+
+def make_returns(n_rows: int = 200, n_cols: int = 4, seed: int = 0) -> np.ndarray:
+    """Returns with NaN gaps in every column."""
+    rng = np.random.default_rng(seed)
+    x = rng.normal(scale=0.01, size=(n_rows, n_cols))
+    x[rng.random(x.shape) < 0.03] = np.nan
+    x[:3, 0] = np.nan
+    return x
+
+
+def reference_rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    """Exact two-pass std of every full window, NaN if any value is missing."""
+    out = np.full(x.shape, np.nan)
+    windows = sliding_window_view(x, window, axis=0)
+    out[window - 1:] = windows.std(axis=-1, ddof=1)
+    return out
+
+
+def reference_rolling_corr(x: np.ndarray, window: int) -> np.ndarray:
+    """Pearson correlation of every full window, NaN if any value is missing."""
+    n_rows, n_cols = x.shape
+    out = np.full((n_rows, n_cols, n_cols), np.nan)
+    for t in range(window - 1, n_rows):
+        w = x[t - window + 1:t + 1]
+        for i in range(n_cols):
+            for j in range(n_cols):
+                a, b = w[:, i], w[:, j]
+                if np.isnan(a).any() or np.isnan(b).any():
+                    continue
+                out[t, i, j] = np.corrcoef(a, b)[0, 1]
+    return out
+
+
+@pytest.mark.parametrize('window', [2, 5, 20])
+def test_rolling_std_matches_reference_with_gaps(window):
+    x = make_returns()
+    out = np.empty(x.shape)
+    rolling_std(x, window, out)
+    np.testing.assert_allclose(out, reference_rolling_std(x, window), rtol=1e-9, atol=1e-15)
+
+
+def test_rolling_std_matches_pandas():
+    x = make_returns()
+    out = np.empty(x.shape)
+    rolling_std(x, 20, out)
+    expected = pd.DataFrame(x).rolling(20).std().to_numpy()
+    np.testing.assert_allclose(out, expected, rtol=1e-8, atol=1e-15)
+
+
+def test_rolling_std_recovers_after_level_shift():
+    rng = np.random.default_rng(1)
+    x = rng.normal(scale=0.01, size=(300, 2))
+    x[:100] += 1e6  # Leaving these behind cancels M2 in the reverse update
+    out = np.empty(x.shape)
+    rolling_std(x, 20, out)
+    expected = reference_rolling_std(x, 20)
+    np.testing.assert_allclose(out[120:], expected[120:], rtol=1e-6)
+
+
+def test_rolling_std_float32_input():
+    x = make_returns()
+    out = np.empty(x.shape)
+    rolling_std(x.astype(np.float32), 20, out)
+    expected = reference_rolling_std(x.astype(np.float32).astype(np.float64), 20)
+    np.testing.assert_allclose(out, expected, rtol=1e-5)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_rolling_corr_matches_reference_with_gaps(dtype):
+    x = make_returns(n_rows=80).astype(dtype)
+    out = np.empty((x.shape[0], x.shape[1], x.shape[1]))
+    rolling_corr(x, 10, out)
+    expected = reference_rolling_corr(x.astype(np.float64), 10)
+    np.testing.assert_allclose(out, expected, atol=1e-6)
+
+
+def test_mask_ffill_matches_pandas():
+    x = make_returns()
+    x[50, 1] = 1.0
+    x[120, 2] = -1.0
+    mean = np.nanmean(x, axis=0)
+    std = np.nanstd(x, axis=0, ddof=1)
+    out = np.empty(x.shape)
+    n_outliers = np.empty(x.shape[1], dtype=np.int64)
+    mask_ffill(x, mean, std, 5.0, out, n_outliers)
+    
+    df = pd.DataFrame(x)
+    outliers = (df - mean).abs() > 5.0 * std
+    expected = df.mask(outliers).ffill().to_numpy()
+    np.testing.assert_array_equal(out, expected)
+    np.testing.assert_array_equal(n_outliers, outliers.sum().to_numpy())
+    assert n_outliers[1] >= 1 and n_outliers[2] >= 1
+
+
+def test_row_std_matches_pandas():
+    x = make_returns(n_cols=6)
+    x[10] = np.nan
+    x[11, 1:] = np.nan  # A single valid value
+    expected = pd.DataFrame(x).std(axis=1).to_numpy()
+    np.testing.assert_allclose(row_std(x), expected, rtol=1e-12)
+    assert np.isnan(row_std(x)[[10, 11]]).all()
+
+
+def run_step(prices_row, state, sig_idx, sig_size, sig_sign, last_val, cost_mul=1.0):
+    n = len(prices_row)
+    fills = (np.zeros(n, dtype=np.int8), np.zeros(n), np.zeros(n))
+    value, n_trades = step(
+        np.asarray(prices_row, dtype=np.float64),
+        *state,
+        cost_mul,
+        np.asarray(sig_idx, dtype=np.intp),
+        np.asarray(sig_size, dtype=np.float64),
+        np.asarray(sig_sign, dtype=np.float64),
+        last_val,
+        *fills
+    )
+    return value, n_trades, fills
+
+
+def test_step_opens_marks_and_closes_positions():
+    state = (np.zeros(3), np.zeros(3), np.zeros(3), np.zeros(3, dtype=np.bool_))
+    qty, entry, sign, active = state
+    
+    # Open a long in 0 and a short in 2
+    value, n_trades, (kind, fill_qty, fill_cost) = run_step(
+        [10.0, 20.0, 40.0], state, [0, 2], [100.0, 200.0], [1.0, -1.0], 1000.0, cost_mul=1.01
+    )
+    assert n_trades == 2 and value == 1000.0
+    np.testing.assert_array_equal(kind, [1, 0, 1])
+    np.testing.assert_allclose(fill_qty, [10.0, 0.0, 5.0])
+    np.testing.assert_allclose(fill_cost, [101.0, 0.0, 202.0])
+    np.testing.assert_array_equal(active, [True, False, True])
+    
+    # Keep 0 and mark it to market, close 2
+    value, n_trades, (kind, fill_qty, fill_cost) = run_step(
+        [11.0, 20.0, 38.0], state, [0], [100.0], [1.0], 1000.0
+    )
+    assert n_trades == 1
+    assert value == pytest.approx(1000.0 + 10.0 * 1.0)
+    np.testing.assert_array_equal(kind, [0, 0, -1])
+    np.testing.assert_allclose(fill_qty[2], 5.0)
+    np.testing.assert_array_equal(active, [True, False, False])
+    assert sign[2] == -1.0 and qty[2] == 0.0
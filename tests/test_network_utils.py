@@ -0,0 +1,183 @@
+import asyncio
+import json
+import time
+import pytest
+
+httpx = pytest.importorskip('httpx')
+dns = pytest.importorskip('dns')
+
+import dns.name
+import dns.rdata
+import dns.resolver
+
+import src.utils.network_utils as network_utils
+
+
+def pihole_transport(server):
+    """Mock transport answering the status and query log endpoints."""
+    def handler(request):
+        server['requests'] += 1
+        body = server['status'] if 'status' in request.url.query.decode() else server['queries']
+        return httpx.Response(200, content=json.dumps(body).encode())
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def pihole(monkeypatch):
+    """Point the shared HTTP client at a mock PiHole with fresh caches."""
+    monkeypatch.setitem(network_utils._PIHOLE_ALIVE, 'val', None)
+    monkeypatch.setitem(network_utils._PIHOLE_ALIVE, 'exp', 0.0)
+    monkeypatch.setitem(network_utils._PIHOLE_BLOCKED, 'domains', None)
+    monkeypatch.setitem(network_utils._PIHOLE_BLOCKED, 'exp', 0.0)
+    
+    def install(status, queries):
+        server = {'status': status, 'queries': queries, 'requests': 0}
+        monkeypatch.setattr(
+            network_utils,
+            '_HTTP',
+            httpx.AsyncClient(transport=pihole_transport(server))
+        )
+        return server
+    return install
+
+
+def test_pihole_blocked_domains_are_reported(pihole):
+    rows = [
+        [1700000000, 'A', 'fc.yahoo.com', '10.0.0.2', 1, 0],
+        [1700000001, 'A', 'query1.finance.yahoo.com', '10.0.0.2', 2, 0]
+    ]
+    pihole({'status': 'enabled'}, {'data': rows})
+    assert network_utils.check_pihole_blocking() == (True, ['fc.yahoo.com'])
+
+
+def test_pihole_unauthenticated_query_log_is_not_blocked(pihole):
+    pihole({'status': 'enabled'}, [])
+    assert network_utils.check_pihole_blocking() == (False, [])
+
+
+@pytest.mark.parametrize('status', [[], 'enabled', None])
+def test_pihole_unexpected_status_is_not_blocked(pihole, status):
+    pihole(status, {'data': [[1700000000, 'A', 'fc.yahoo.com', '10.0.0.2', 1, 0]]})
+    assert network_utils.check_pihole_blocking() == (False, [])
+
+
+def test_dns_refresh_follows_cached_expiry(monkeypatch):
+    monkeypatch.setattr(network_utils, '_DNS_CACHE', {})
+    monkeypatch.setattr(network_utils, '_DNS_REFRESH_MARGIN', 0.05)
+    monkeypatch.setattr(network_utils, '_DNS_REFRESH_MIN', 0.01)
+    lookups = []
+    
+    async def lookup(domain):
+        lookups.append(domain)
+        network_utils._DNS_CACHE[domain] = (('192.0.2.1',), time.monotonic() + 0.15)
+        return ('192.0.2.1',)
+    
+    monkeypatch.setattr(network_utils, '_lookup', lookup)
+    network_utils._DNS_CACHE['example.com'] = (('192.0.2.1',), time.monotonic() + 0.15)
+    
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(network_utils._refresh_dns(['example.com']), 0.5)
+    asyncio.run(run())
+    
+    # A refresh every ~0.1s, never waiting out _DNS_REFRESH_INTERVAL
+    assert len(lookups) >= 3
+
+
+def query_row(domain, status):
+    return [1700000000, 'A', domain, '10.0.0.2', status, 0]
+
+
+def test_pihole_snapshot_miss_is_rechecked(pihole):
+    server = pihole({'status': 'enabled'}, {'data': [query_row('ads.example.com', 1)]})
+    assert network_utils.check_pihole_blocking() == (False, [])
+    
+    # yfinance queries the Yahoo hosts after the snapshot was taken
+    server['queries'] = {'data': [query_row('fc.yahoo.com', 1)]}
+    assert network_utils.check_pihole_blocking() == (True, ['fc.yahoo.com'])
+
+
+def test_pihole_snapshot_hit_is_reused(pihole):
+    server = pihole({'status': 'enabled'}, {'data': [query_row('fc.yahoo.com', 1)]})
+    assert network_utils.check_pihole_blocking() == (True, ['fc.yahoo.com'])
+    requests = server['requests']
+    assert network_utils.check_pihole_blocking() == (True, ['fc.yahoo.com'])
+    assert server['requests'] == requests
+
+
+def test_invalidate_verify_cache_drops_network_caches(pihole, monkeypatch):
+    monkeypatch.setattr(network_utils, '_DNS_CACHE', {'fc.yahoo.com': (('192.0.2.1',), time.monotonic() + 60)})
+    pihole({'status': 'enabled'}, {'data': [query_row('fc.yahoo.com', 1)]})
+    network_utils.check_pihole_blocking()
+    network_utils._PIHOLE_ALIVE['val'] = False
+    network_utils._PIHOLE_ALIVE['exp'] = time.monotonic() + 60
+    
+    network_utils.invalidate_verify_cache()
+    
+    assert network_utils._DNS_CACHE == {}
+    assert network_utils._PIHOLE_BLOCKED['domains'] is None
+    assert network_utils._PIHOLE_ALIVE['val'] is None
+
+
+class FakeAnswer(list):
+    """A/AAAA answer holding the given addresses."""
+    
+    def __init__(self, addresses, ttl=60):
+        super().__init__(dns.rdata.from_text('IN', 'AAAA' if ':' in a else 'A', a) for a in addresses)
+        self.rrset = type('RRset', (), {'ttl': ttl})()
+
+
+class FakeResolver:
+    """Resolver returning a fixed A answer or raising a fixed error."""
+    
+    def __init__(self, result):
+        self.result = result
+        self.queries = 0
+    
+    async def resolve(self, domain, rdtype):
+        self.queries += 1
+        if rdtype == 'AAAA':
+            raise dns.resolver.NoAnswer()
+        if isinstance(self.result, BaseException):
+            raise self.result
+        return FakeAnswer(self.result)
+
+
+@pytest.fixture
+def resolvers(monkeypatch):
+    """Install a fake system resolver and one fake public resolver."""
+    monkeypatch.setattr(network_utils, '_DNS_CACHE', {})
+    
+    def install(system_result, public_result=('192.0.2.10',)):
+        system, public = FakeResolver(system_result), FakeResolver(public_result)
+        monkeypatch.setattr(network_utils, '_RESOLVERS', (system, [public]))
+        return system, public
+    return install
+
+
+@pytest.mark.parametrize('system_result', [
+    dns.resolver.NXDOMAIN(qnames=[dns.name.from_text('fc.yahoo.com')]),
+    ('0.0.0.0',),
+    ('127.0.0.1',)
+])
+def test_local_dns_blocking_is_not_masked_by_public_resolvers(resolvers, system_result):
+    system, public = resolvers(system_result)
+    assert network_utils.check_dns_connectivity(['fc.yahoo.com']) == (False, ['fc.yahoo.com'])
+    assert public.queries == 0
+
+
+@pytest.mark.parametrize('system_result', [
+    dns.resolver.LifetimeTimeout(timeout=2.0, errors=[]),
+    dns.resolver.NoNameservers()
+])
+def test_public_resolvers_are_used_when_system_resolver_fails(resolvers, system_result):
+    system, public = resolvers(system_result)
+    assert network_utils.check_dns_connectivity(['fc.yahoo.com']) == (True, [])
+    assert public.queries > 0
+
+
+def test_system_resolver_answer_is_used(resolvers):
+    system, public = resolvers(('192.0.2.1',))
+    assert network_utils.check_dns_connectivity(['fc.yahoo.com']) == (True, [])
+    assert network_utils._DNS_CACHE['fc.yahoo.com'][0] == ('192.0.2.1',)
+    assert public.queries == 0